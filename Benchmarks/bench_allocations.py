@@ -0,0 +1,49 @@
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from Task3.game_of_life import GameEngine, ENGINES
+
+
+def measure_allocations(engine: GameEngine, generations: int) -> tuple:
+    """Returns memory retained after the generations and the highest peak of memory allocated
+    during a single generation, in bytes"""
+    engine.advance(2)  # warm-up
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    max_peak = 0
+    for _ in range(generations):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        engine.compute_iter()
+        engine.swap_boards()
+        _, peak = tracemalloc.get_traced_memory()
+        max_peak = max(max_peak, peak - before)
+    end_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return end_memory - start_memory, max_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures memory allocated per Game of Life generation')
+    parser.add_argument('--config', default='Task3/config.json')
+    parser.add_argument('--size', type=int, default=512, help='board size, cells engine uses 64')
+    parser.add_argument('--generations', type=int, default=20)
+    args = parser.parse_args()
+
+    for engine_name in ['cells', 'numpy', 'tiled', 'bits']:
+        size = 64 if engine_name == 'cells' else args.size
+        engine = GameEngine(args.config)
+        engine.engine = engine_name
+        init_array = np.random.default_rng(0).integers(0, 2, size=(size, size), dtype=np.uint8)
+        engine.cells_board = ENGINES[engine_name](init_array)
+        engine.temp_board = ENGINES[engine_name](init_array)
+
+        retained, peak = measure_allocations(engine, args.generations)
+        print(f'{engine_name} ({size}x{size}): retained {retained / args.generations:.0f} B/generation, '
+              f'peak {peak} B in a generation')
+
+
+if __name__ == "__main__":
+    main()
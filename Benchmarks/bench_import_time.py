@@ -0,0 +1,54 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# modules which can be used without GUI and printing, with their import time budgets in ms (numpy not included)
+CORE_MODULES = {'Task1.traffic_lights': 50,
+                'Task1.simulation': 50,
+                'Task2.square_root': 50,
+                'Task2.stream': 50,
+                'Task3.game_of_life': 100}
+GUI_MODULES = ['PyQt5', 'prettytable']
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module: str) -> tuple:
+    """Imports module in a fresh interpreter with numpy already imported.
+    Returns import time in ms and GUI modules loaded by the import"""
+    code = (f'import sys, numpy; import {module}; '
+            f'print(",".join(name for name in {GUI_MODULES} if name in sys.modules))')
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT_DIR, capture_output=True,
+                             text=True, check=True)
+    for line in process.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1000, [name for name in process.stdout.strip().split(',') if name]
+    raise Exception(f'Import time of {module} not found')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measures import time of core modules and checks it with budgets')
+    parser.add_argument('--repeats', type=int, default=5, help='imports of each module, the fastest one is reported')
+    parser.add_argument('--budget-scale', type=float, default=1.0, help='multiplies all budgets, for slow machines')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, budget in CORE_MODULES.items():
+        results = [import_time(module) for _ in range(args.repeats)]
+        best_time = min(time for time, _ in results)
+        gui_modules = results[0][1]
+        status = 'ok'
+        if gui_modules:
+            status = f'FAILED: imports {", ".join(gui_modules)}'
+        elif best_time > budget * args.budget_scale:
+            status = f'FAILED: over budget of {budget * args.budget_scale:.0f} ms'
+        failed = failed or status != 'ok'
+        print(f'{module}: {best_time:.1f} ms | {status}')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from Task3.game_elements import ArrayBoard
+from Task3.parallel_board import ParallelBoard, close_pools
+
+
+def measure_generations(board, temp_board, generations: int) -> float:
+    """Returns generations per second of stepping the board"""
+    board.compute_next(temp_board)  # warm-up, starts worker processes
+    start_time = time.perf_counter()
+    for _ in range(generations):
+        board.compute_next(temp_board)
+        board, temp_board = temp_board, board
+    return generations / (time.perf_counter() - start_time)
+
+
+def measure_speedup(init_array: np.array, workers: int, generations: int) -> tuple:
+    """Returns generations per second of serial numpy board and of parallel board with given workers"""
+    serial_speed = measure_generations(ArrayBoard(init_array), ArrayBoard(init_array), generations)
+    boards = [ParallelBoard(init_array, workers=workers), ParallelBoard(init_array, workers=workers)]
+    try:
+        return serial_speed, measure_generations(*boards, generations)
+    finally:
+        for board in boards:
+            board.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures how parallel Game of Life engine scales with workers')
+    parser.add_argument('--size', type=int, default=2048, help='board size')
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--min-size', type=int, default=64,
+                        help='smallest board size of the search for size where parallel engine starts to win')
+    args = parser.parse_args()
+
+    init_array = np.random.default_rng(0).integers(0, 2, size=(args.size, args.size), dtype=np.uint8)
+    serial_speed = measure_generations(ArrayBoard(init_array), ArrayBoard(init_array), args.generations)
+    print(f'serial: {serial_speed:.1f} gen/s, {serial_speed * init_array.size:.3e} cell updates/s')
+
+    workers = 1
+    while workers <= args.max_workers:
+        boards = [ParallelBoard(init_array, workers=workers), ParallelBoard(init_array, workers=workers)]
+        speed = measure_generations(*boards, args.generations)
+        print(f'{workers} workers: {speed:.1f} gen/s, {speed * init_array.size:.3e} cell updates/s, '
+              f'speedup: {speed / serial_speed:.2f}')
+        for board in boards:
+            board.close()
+        close_pools()
+        workers *= 2
+
+    # board sizes doubling up to --size, crossover is the smallest one where the pool beats serial numpy board
+    crossover = None
+    size = args.min_size
+    while size <= args.size:
+        init_array = np.random.default_rng(0).integers(0, 2, size=(size, size), dtype=np.uint8)
+        serial_speed, speed = measure_speedup(init_array, args.max_workers, args.generations)
+        print(f'{size}x{size}: serial {serial_speed:.1f} gen/s, {args.max_workers} workers {speed:.1f} gen/s, '
+              f'speedup: {speed / serial_speed:.2f}')
+        if crossover is None and speed > serial_speed:
+            crossover = size
+        size *= 2
+    close_pools()
+    if crossover is None:
+        print(f'{args.max_workers} workers are slower than serial numpy board up to {args.size}x{args.size}')
+    else:
+        print(f'crossover: {args.max_workers} workers beat serial numpy board from {crossover}x{crossover}')
+
+
+if __name__ == "__main__":
+    main()
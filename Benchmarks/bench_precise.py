@@ -0,0 +1,58 @@
+import argparse
+import time
+from decimal import Decimal, localcontext
+
+from prettytable import PrettyTable
+
+from Task2.precise_square_root import integer_square_root, decimal_square_root, GUARD_DIGITS
+
+
+def naive_integer_square_root(n: int) -> int:
+    """Newton iterations on full n from a power of two above the root"""
+    root = 1 << ((n.bit_length() + 1) // 2)
+    while True:
+        next_root = (root + n // root) // 2
+        if next_root >= root:
+            return root
+        root = next_root
+
+
+def naive_decimal_square_root(x: Decimal, digits: int) -> Decimal:
+    """Newton iterations at full precision from the start"""
+    with localcontext() as context:
+        context.prec = digits + GUARD_DIGITS
+        root = Decimal(float(x) ** 0.5)
+        while True:
+            next_root = (root + x / root) / 2
+            if next_root == root:
+                break
+            root = next_root
+        context.prec = digits
+        return +root
+
+
+def measure(func, *args) -> float:
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares precision-doubling square roots with naive Newton method')
+    parser.add_argument('--digits', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    summary = PrettyTable()
+    summary.title = 'Square root time [s]'
+    summary.field_names = ['Digits', 'Integer', 'Naive integer', 'Decimal', 'Naive decimal']
+    for digits in args.digits:
+        n = 7 * 10 ** (2 * digits - 1) + 12345
+        summary.add_row([digits,
+                         round(measure(integer_square_root, n), 4), round(measure(naive_integer_square_root, n), 4),
+                         round(measure(decimal_square_root, Decimal(2), digits), 4),
+                         round(measure(naive_decimal_square_root, Decimal(2), digits), 4)])
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import random
+import threading
+import time
+
+from Task1.scheduler import TrafficLightScheduler, create_lights, CYCLE_TIME
+
+
+def sleep_lateness(duration: float, interval: float = 1e-3) -> float:
+    """Returns max lateness of plain time.sleep, the noise floor of the system"""
+    max_lateness = 0
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        deadline = time.monotonic() + interval
+        time.sleep(interval)
+        max_lateness = max(max_lateness, time.monotonic() - deadline)
+    return max_lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs many traffic lights in one thread and measures timing jitter')
+    parser.add_argument('--lights', type=int, default=10000)
+    parser.add_argument('--duration', type=float, default=10, help='seconds of run')
+    parser.add_argument('--pedestrian-rate', type=float, default=100, help='pedestrian requests per second')
+    args = parser.parse_args()
+
+    lights = create_lights(args.lights)
+    offsets = [random.uniform(0, CYCLE_TIME) for _ in lights]
+    scheduler = TrafficLightScheduler(lights, offsets)
+
+    def press_buttons():
+        while scheduler.running or scheduler.start_time is None:
+            scheduler.request_crossing(random.randrange(args.lights))
+            time.sleep(1 / args.pedestrian_rate)
+
+    pedestrians = threading.Thread(target=press_buttons, daemon=True)
+    pedestrians.start()
+    start_cpu_time = time.process_time()
+    scheduler.run(args.duration)
+    cpu_time = time.process_time() - start_cpu_time
+
+    print(f'{args.lights} lights, {scheduler.transitions_count} transitions in {args.duration} s')
+    mean_lateness = scheduler.total_lateness / max(scheduler.transitions_count, 1)
+    print(f'Mean lateness: {mean_lateness * 1e3:.3f} ms, max lateness: {scheduler.max_lateness * 1e3:.3f} ms '
+          f'(plain sleep: {sleep_lateness(1) * 1e3:.3f} ms)')
+    print(f'CPU time: {cpu_time:.2f} s ({100 * cpu_time / args.duration:.1f}% of one core)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import time
+
+import numpy as np
+from prettytable import PrettyTable
+
+from Task2.square_root import solve_square_root, calculate_square_root_batch, initial_guess, converged
+
+SEEDS = {'auto': initial_guess,
+         'x1 = 1': np.ones_like,
+         'x1 = n': lambda n: n.copy()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares Newton iterations from automatic and user start points')
+    parser.add_argument('--relative-epsilon', type=float, default=1e-14)
+    parser.add_argument('--max-iterations', type=int, default=5000)
+    parser.add_argument('--decades-step', type=int, default=50, help='decades between rows of the report')
+    args = parser.parse_args()
+
+    n = np.logspace(-300, 300, 6001)
+    eps = args.relative_epsilon * np.sqrt(n)
+
+    summary = PrettyTable()
+    summary.title = f'Newton method for n in [1e-300, 1e300], relative epsilon {args.relative_epsilon}'
+    summary.field_names = ['Start point', 'Mean iters', 'Max iters', 'Not converged', 'Scalar time [ms]',
+                           'Batch time [ms]']
+    iterations = {}
+    np.seterr(over='ignore')  # initial error of x1 = n overflows for large n
+    for seed_name, seed in SEEDS.items():
+        start_points = seed(n)
+        start_time = time.perf_counter()
+        for idx in range(n.size):
+            solve_square_root(n[idx], eps[idx], args.max_iterations, start_points[idx], [], 'newton')
+        scalar_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        _, errors, iterations[seed_name] = calculate_square_root_batch(n, eps, args.max_iterations, start_points)
+        batch_time = time.perf_counter() - start_time
+        not_converged = np.count_nonzero(~converged(errors, eps))
+        summary.add_row([seed_name, round(iterations[seed_name].mean(), 2), iterations[seed_name].max(),
+                         not_converged, round(scalar_time * 1e3, 1), round(batch_time * 1e3, 1)])
+    print(summary)
+
+    per_decade = PrettyTable()
+    per_decade.title = 'Iterations per n'
+    per_decade.field_names = ['n'] + list(SEEDS.keys())
+    for idx in range(0, n.size, args.decades_step * 10):
+        per_decade.add_row([f'{n[idx]:.0e}'] + [iterations[seed_name][idx] for seed_name in SEEDS])
+    print(per_decade)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+import numpy as np
+from prettytable import PrettyTable
+
+from Task1.simulation import simulate
+from Task2.square_root import solve_square_root, calculate_square_root_batch, initial_guess
+from Task3.game_of_life import GameEngine, ENGINES
+
+BOARD_SIZES = [64, 256, 1024, 4096]
+QUICK_BOARD_SIZES = [64, 256]
+DENSITIES = [0.05, 0.3]
+GAME_ENGINES = ['cells', 'numpy', 'bits', 'tiled']
+MAX_CELLS_ENGINE_SIZE = 64  # cells engine takes seconds per generation of larger boards
+SQUARE_ROOT_INPUTS = {'small': 1e-6, 'unit': 2.0, 'large': 1e12}
+
+
+def measure(func, min_time: float = 0.2, repeats: int = 3) -> float:
+    """Returns the best time of a single func call in seconds.
+    Calls are grouped so that a group takes at least min_time"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeats, number)) / number
+
+
+def game_engine(engine_name: str, size: int, density: float, config_path: str) -> GameEngine:
+    engine = GameEngine(config_path)
+    engine.engine = engine_name
+    board = (np.random.default_rng(0).random((size, size)) < density).astype(np.uint8)
+    engine.cells_board = ENGINES[engine_name](board)
+    engine.temp_board = ENGINES[engine_name](board)
+    return engine
+
+
+def benchmark_game_of_life(sizes: list, config_path: str, min_time: float) -> dict:
+    """Seconds per compute_iter of every engine, board size and density"""
+    results = {}
+    for engine_name in GAME_ENGINES:
+        for size in sizes:
+            if engine_name == 'cells' and size > MAX_CELLS_ENGINE_SIZE:
+                continue
+            for density in DENSITIES:
+                engine = game_engine(engine_name, size, density, config_path)
+
+                def step():
+                    engine.compute_iter()
+                    engine.swap_boards()
+
+                results[f'gol/{engine_name}/{size}x{size}/density={density}'] = measure(step, min_time)
+    return results
+
+
+def benchmark_square_root(min_time: float) -> dict:
+    """Seconds per scalar solve of each method and per element of batch solve over wide range of inputs"""
+    results = {}
+    for input_name, n in SQUARE_ROOT_INPUTS.items():
+        search_range = [0, max(n, 1)]
+        for method in ['newton', 'bisection']:
+            results[f'sqrt/{method}/scalar/{input_name}'] = measure(
+                lambda: solve_square_root(n, 1e-9 * np.sqrt(n), 1000, float(initial_guess(n)), search_range,
+                                          method), min_time)
+
+    n = np.logspace(-6, 12, 100000)
+    search_ranges = np.column_stack([np.zeros_like(n), np.maximum(n, 1)])
+    for method in ['newton', 'bisection']:
+        batch_time = measure(lambda: calculate_square_root_batch(n, 1e-9 * np.sqrt(n), 1000, None, search_ranges,
+                                                                 method), min_time)
+        results[f'sqrt/{method}/batch/element'] = batch_time / n.size
+    return results
+
+
+def benchmark_traffic_lights(min_time: float) -> dict:
+    """Seconds per transition of simulated traffic lights"""
+    results = {}
+    for lights_count, duration in [(1, 24 * 3600), (100, 3600)]:
+        transitions_count = len(simulate(lights_count, duration))
+        results[f'traffic/{lights_count} lights/transition'] = measure(
+            lambda: simulate(lights_count, duration), min_time) / transitions_count
+    return results
+
+
+def run_benchmarks(sizes: list, config_path: str, min_time: float) -> dict:
+    results = {}
+    results.update(benchmark_game_of_life(sizes, config_path, min_time))
+    results.update(benchmark_square_root(min_time))
+    results.update(benchmark_traffic_lights(min_time))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns (name, baseline time, current time, ratio) of benchmarks slower than baseline by more than threshold"""
+    regressions = []
+    for name, current_time in results.items():
+        if name in baseline and current_time > baseline[name] * (1 + threshold):
+            regressions.append((name, baseline[name], current_time, current_time / baseline[name]))
+    return regressions
+
+
+def print_results(results: dict, baseline: dict, threshold: float) -> None:
+    summary = PrettyTable()
+    summary.title = 'Benchmarks'
+    summary.field_names = ['Benchmark', 'Time [μs]', 'Baseline [μs]', 'Ratio', 'Status']
+    summary.align['Benchmark'] = 'l'
+    for name, current_time in results.items():
+        if name in baseline:
+            ratio = current_time / baseline[name]
+            status = 'REGRESSION' if ratio > 1 + threshold else 'ok'
+            summary.add_row([name, f'{current_time * 1e6:.3f}', f'{baseline[name] * 1e6:.3f}', f'{ratio:.2f}', status])
+        else:
+            summary.add_row([name, f'{current_time * 1e6:.3f}', '', '', 'new'])
+    print(summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs benchmarks of all tasks and compares them with a baseline')
+    parser.add_argument('--config', default='Task3/config.json')
+    parser.add_argument('--quick', action='store_true', help=f'only boards up to {QUICK_BOARD_SIZES[-1]} cells wide')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds of a single measurement')
+    parser.add_argument('--save', help='writes results as a new JSON baseline')
+    parser.add_argument('--compare', help='JSON baseline, exits with status 1 if any benchmark regressed')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown relative to baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(QUICK_BOARD_SIZES if args.quick else BOARD_SIZES, args.config, args.min_time)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'numpy': np.__version__, 'machine': platform.machine(),
+                       'results': results}, f, indent=2)
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold)
+        for name, baseline_time, current_time, ratio in regressions:
+            print(f'{name}: {baseline_time * 1e6:.3f} -> {current_time * 1e6:.3f} μs ({ratio:.2f}x)')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import heapq
+import threading
+import time
+from itertools import count
+
+
+class SystemClock:
+    """Wall clock, waits really block the thread"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: float = None) -> bool:
+        """Waits until event is set or timeout passes, returns True if event is set"""
+        return event.wait(timeout)
+
+
+class VirtualClock:
+    """Simulated clock which jumps straight to the next scheduled callback or timeout instead of waiting"""
+
+    def __init__(self, start: float = 0):
+        self.time = start
+        self.callbacks = []  # heap of (time, sequence number, callback, args)
+        self.sequence = count()
+
+    def now(self) -> float:
+        return self.time
+
+    def call_at(self, when: float, callback, *args) -> None:
+        """Schedules callback(*args) at virtual time when, e.g. a pedestrian pressing the button"""
+        heapq.heappush(self.callbacks, (when, next(self.sequence), callback, args))
+
+    def sleep(self, seconds: float) -> None:
+        self.wait(None, seconds)
+
+    def wait(self, event: threading.Event = None, timeout: float = None) -> bool:
+        """Runs callbacks scheduled before timeout and returns True as soon as one of them sets event,
+        otherwise moves time to the end of timeout and returns False"""
+        if event is not None and event.is_set():
+            return True
+        deadline = float('inf') if timeout is None else self.time + timeout
+
+        while self.callbacks and self.callbacks[0][0] <= deadline:
+            when, _, callback, args = heapq.heappop(self.callbacks)
+            self.time = max(self.time, when)
+            callback(*args)
+            if event is not None and event.is_set():
+                return True
+        if timeout is None:
+            raise Exception('Waiting without timeout after the last scheduled callback would never end')
+        self.time = deadline
+        return False
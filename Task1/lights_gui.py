@@ -1,7 +1,9 @@
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QPushButton, QButtonGroup, QVBoxLayout, QGroupBox, QGridLayout, QDialog, QTextEdit
-from traffic_lights import TrafficLight
-from Utils.utils import Worker, CustomThread
+from PyQt5.QtWidgets import QPushButton, QButtonGroup, QVBoxLayout, QGroupBox, QGridLayout, QDialog
+from traffic_lights import TrafficLight, format_state
+from Utils.utils import UpdateChannel, LogView, worker_pool
+
+MAX_LOG_UPDATES = 10  # log updates per second
 
 
 class LightsGUI(QDialog):
@@ -11,8 +13,9 @@ class LightsGUI(QDialog):
         self.title = 'Traffic lights system'
         self.init_ui()
         self.engine = engine
-        self.worker = Worker(func=self.engine.run, update_logs_func=self.update_console_logs)
-        self.threading = CustomThread(worker=self.worker)
+        self.task = None
+        self.logs_channel = UpdateChannel(max_rate=MAX_LOG_UPDATES)
+        self.logs_channel.updates_ready.connect(self.update_console_logs)
 
     def init_ui(self) -> None:
         """GUI initialization"""
@@ -45,9 +48,8 @@ class LightsGUI(QDialog):
         self.btn_grp.buttonClicked.connect(self.on_click)
 
         # Text area for console logs
-        self.info_area = QTextEdit()
+        self.info_area = LogView()
         self.info_area.setObjectName('Console logs')
-        self.info_area.setReadOnly(True)
         self.layout.addWidget(self.info_area, alignment=Qt.AlignTop)
 
         self.setLayout(self.layout)
@@ -57,10 +59,17 @@ class LightsGUI(QDialog):
         if btn.text() == 'Start':
             print('System started!')
             self.start_btn.setEnabled(False)
-            self.threading.run_task()  # runs state machine
+            # runs state machine in background thread
+            self.task = worker_pool().submit(self.engine.run, {'update_logs_func': self.logs_channel.publish},
+                                             on_cancel=self.engine.stop)
         elif btn.text() == 'Pedestrian btn':
             self.engine.pedestrian_btn = True
 
-    def update_console_logs(self, data):
-        self.info_area.append(data)
-        self.info_area.ensureCursorVisible()
+    def update_console_logs(self, transitions: list) -> None:
+        """Appends (run time, state) transitions collected since previous update"""
+        self.info_area.append_lines([format_state(run_time, state) for run_time, state in transitions])
+
+    def closeEvent(self, event):
+        if self.task is not None:
+            self.task.cancel()
+        super().closeEvent(event)
@@ -0,0 +1,119 @@
+import heapq
+import threading
+from collections import deque
+
+from Task1.clock import SystemClock
+from Task1.traffic_lights import TrafficLight, STATES, TABLE
+from Utils.metrics import metrics
+
+CYCLE_TIME = sum(TABLE.delay[state] for state in STATES)
+
+
+def phase_state(offset: float) -> tuple:
+    """Returns state and time left in it for a light whose cycle started offset seconds ago in state 1"""
+    state = 1
+    offset %= CYCLE_TIME
+    while offset >= TABLE.delay[state]:
+        offset -= TABLE.delay[state]
+        state = TABLE.next_state[state]
+    return state, TABLE.delay[state] - offset
+
+
+class TrafficLightScheduler:
+    """Drives many traffic lights from a single thread with a heap of transition deadlines.
+    Pedestrian requests may come from any thread"""
+
+    def __init__(self, lights: list, offsets: list = None, on_transition=None, clock=None):
+        self.clock = clock or SystemClock()
+        self.lights = lights
+        self.offsets = offsets or [0] * len(lights)
+        self.on_transition = on_transition  # called with light's index after every transition
+        self.deadlines = []  # heap of (deadline, light's index, version)
+        self.versions = [0] * len(lights)  # deadlines of older versions are cancelled
+        self.requests = deque()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.start_time = None
+        self.transitions_count = 0
+        self.max_lateness = 0
+        self.total_lateness = 0
+
+    def start(self) -> None:
+        """Sets lights' states according to their phase offsets and schedules their first transitions"""
+        phases = [phase_state(offset) for offset in self.offsets]
+        for light, (state, _) in zip(self.lights, phases):
+            light.change_lights(state)
+        self.start_time = self.clock.now()
+        self.deadlines = [(self.start_time + time_left, idx, self.versions[idx])
+                          for idx, (_, time_left) in enumerate(phases)]
+        heapq.heapify(self.deadlines)
+
+    def schedule(self, idx: int, deadline: float) -> None:
+        self.versions[idx] += 1
+        heapq.heappush(self.deadlines, (deadline, idx, self.versions[idx]))
+
+    def request_crossing(self, idx: int) -> None:
+        """Presses pedestrian button of idx-th light, thread-safe"""
+        self.requests.append(idx)
+        self.wakeup.set()
+
+    def handle_requests(self, now: float) -> None:
+        """Ends pedestrian state of requesting lights now, other lights remember the request"""
+        while self.requests:
+            idx = self.requests.popleft()
+            light = self.lights[idx]
+            if TABLE.pedestrian_interrupt[light.state]:
+                self.schedule(idx, now)
+            else:
+                light.pedestrian_btn = True
+
+    def transition(self, idx: int, now: float) -> None:
+        light = self.lights[idx]
+        if TABLE.pedestrian_interrupt[light.state]:
+            light.pedestrian_btn = False
+        dst_state = TABLE.next_state[light.state]
+        light.run_time = int(now - self.start_time)
+        light.change_lights(dst_state)
+        delay = TABLE.delay[dst_state]
+        if TABLE.pedestrian_interrupt[dst_state] and light.pedestrian_btn:
+            delay = 0  # button was pressed before the light got to pedestrian state
+        self.schedule(idx, now + delay)
+        self.transitions_count += 1
+        if self.on_transition is not None:
+            self.on_transition(idx)
+
+    def run(self, duration: float = None) -> None:
+        """Runs transitions at their deadlines until stop is called or duration passes"""
+        if self.start_time is None:
+            self.start()
+        end_time = None if duration is None else self.clock.now() + duration
+        self.running = True
+        while self.running:
+            self.wakeup.clear()  # before handling requests, so that a request arriving later wakes up next wait
+            now = self.clock.now()
+            self.handle_requests(now)
+            while self.deadlines and self.deadlines[0][0] <= now:
+                deadline, idx, version = heapq.heappop(self.deadlines)
+                if version != self.versions[idx]:
+                    continue
+                self.max_lateness = max(self.max_lateness, now - deadline)
+                self.total_lateness += now - deadline
+                metrics.observe('traffic.lateness', now - deadline)
+                self.transition(idx, now)
+
+            if end_time is not None and now >= end_time:
+                break
+            timeout = self.deadlines[0][0] - now if self.deadlines else None
+            if end_time is not None:
+                timeout = end_time - now if timeout is None else min(timeout, end_time - now)
+            self.clock.wait(self.wakeup, timeout)
+        self.running = False
+
+    def stop(self) -> None:
+        """Stops run, thread-safe"""
+        self.running = False
+        self.wakeup.set()
+
+
+def create_lights(count: int, console_logs: bool = False, clock=None) -> list:
+    return [TrafficLight(console_logs=console_logs, clock=clock) for _ in range(count)]
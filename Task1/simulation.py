@@ -0,0 +1,111 @@
+import argparse
+import csv
+import random
+import sys
+import time
+from array import array
+
+from Task1.clock import VirtualClock
+from Task1.scheduler import TrafficLightScheduler, create_lights, CYCLE_TIME
+from Utils.metrics import metrics
+
+
+class TransitionLog:
+    """State transitions stored in typed arrays, 13 bytes per transition"""
+
+    def __init__(self):
+        self.times = array('d')
+        self.lights = array('I')
+        self.states = array('B')
+
+    def append(self, timestamp: float, light: int, state: int) -> None:
+        self.times.append(timestamp)
+        self.lights.append(light)
+        self.states.append(state)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        """Yields (time, light's index, state) tuples"""
+        return zip(self.times, self.lights, self.states)
+
+    def write_csv(self, f) -> None:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'light', 'state'])
+        writer.writerows(self)
+
+
+def simulate(lights_count: int, duration: float, offsets: list = None, pedestrian_arrivals=()) -> TransitionLog:
+    """Runs lights for duration of virtual time, jumping straight from one event to the next.
+    pedestrian_arrivals are (time, light's index) pairs.
+    Returns log with initial states at time 0 and all transitions"""
+    clock = VirtualClock()
+    lights = create_lights(lights_count, clock=clock)
+    log = TransitionLog()
+    scheduler = TrafficLightScheduler(lights, offsets, clock=clock,
+                                      on_transition=lambda idx: log.append(clock.now(), idx, lights[idx].state))
+    scheduler.start()
+    for idx, light in enumerate(lights):
+        log.append(0, idx, light.state)
+    for arrival_time, idx in pedestrian_arrivals:
+        clock.call_at(arrival_time, scheduler.request_crossing, idx)
+    scheduler.run(duration)
+    return log
+
+
+def load_arrivals(path: str) -> list:
+    """Loads pedestrian arrivals from CSV file with "time, light" rows"""
+    with open(path) as f:
+        rows = [row for row in csv.reader(f) if row and row[0] != 'time']
+    return [(float(arrival_time), int(idx)) for arrival_time, idx in rows]
+
+
+def random_arrivals(lights_count: int, duration: float, rate: float, seed: int = 0) -> list:
+    """Returns Poisson arrivals with rate pedestrians per second at each light"""
+    rng = random.Random(seed)
+    arrivals = []
+    for idx in range(lights_count):
+        arrival_time = rng.expovariate(rate)
+        while arrival_time < duration:
+            arrivals.append((arrival_time, idx))
+            arrival_time += rng.expovariate(rate)
+    return arrivals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulates traffic lights in virtual time')
+    parser.add_argument('--lights', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=24 * 3600, help='simulated seconds')
+    parser.add_argument('--pedestrians', default=None, help='CSV file with "time, light" pedestrian arrivals')
+    parser.add_argument('--pedestrian-rate', type=float, default=0,
+                        help='random pedestrian arrivals per second at each light, if no file is given')
+    parser.add_argument('--random-offsets', action='store_true', help='random phase offsets of lights')
+    parser.add_argument('--output', default=None, help='CSV file with transitions log')
+    parser.add_argument('--metrics', help='writes transitions count and timings to JSON (or Prometheus .prom) file')
+    args = parser.parse_args(argv)
+    metrics.enabled = args.metrics is not None
+
+    if args.pedestrians:
+        arrivals = load_arrivals(args.pedestrians)
+    elif args.pedestrian_rate > 0:
+        arrivals = random_arrivals(args.lights, args.duration, args.pedestrian_rate)
+    else:
+        arrivals = []
+    offsets = [random.uniform(0, CYCLE_TIME) for _ in range(args.lights)] if args.random_offsets else None
+
+    start_time = time.perf_counter()
+    with metrics.timer('traffic.simulation'):
+        log = simulate(args.lights, args.duration, offsets, arrivals)
+    elapsed_time = time.perf_counter() - start_time
+    print(f'{len(log)} transitions of {args.lights} lights in {args.duration} simulated seconds '
+          f'took {elapsed_time:.3f} s', file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            log.write_csv(f)
+    if args.metrics:
+        metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
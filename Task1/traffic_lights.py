@@ -1,65 +1,149 @@
-from datetime import datetime
-from PyQt5.QtWidgets import QApplication
+import threading
+from array import array
+from collections import namedtuple
+
+from Task1.clock import SystemClock
+from Utils.metrics import metrics
+
+LOG_SIZE = 64  # last transitions kept by each traffic light
+# states' lights, next state after delay [s] and whether pedestrian button ends the state immediately
+STATES = {
+    1: {'pedestrian_light': 'green', 'car_light': 'red', 'next_state': 2, 'delay': 10},
+    2: {'pedestrian_light': 'red', 'car_light': 'green', 'next_state': 3, 'delay': 20, 'pedestrian_interrupt': True},
+    3: {'pedestrian_light': 'red', 'car_light': 'yellow', 'next_state': 1, 'delay': 2},
+}
+
+StateTable = namedtuple('StateTable', ['pedestrian_light', 'car_light', 'next_state', 'delay', 'pedestrian_interrupt'])
+
+
+def compile_states(states: dict) -> StateTable:
+    """Compiles states' declarations into tuples indexed by state"""
+    for state, declaration in states.items():
+        if declaration['next_state'] not in states:
+            raise Exception(f'Next state {declaration["next_state"]} of state {state} is not declared')
+    size = max(states) + 1
+    columns = {field: [None] * size for field in StateTable._fields}
+    for state, declaration in states.items():
+        for field in StateTable._fields:
+            columns[field][state] = declaration.get(field, False)
+    return StateTable(**{field: tuple(column) for field, column in columns.items()})
+
+
+TABLE = compile_states(STATES)
+
+
+def format_state(run_time: float, state: int) -> str:
+    return (f'{int(run_time)} seconds | State {state} -> '
+            f'Pedestrian light: {TABLE.pedestrian_light[state]}'
+            f' | Car light: {TABLE.car_light[state]}')
+
+
+class StateLog:
+    """Ring buffer of the last capacity (time, state) transitions, formatted only when read"""
+
+    def __init__(self, capacity: int = LOG_SIZE):
+        self.times = array('d', bytes(8 * capacity))
+        self.states = array('B', bytes(capacity))
+        self.size = 0
+        self.next_idx = 0
+
+    def record(self, timestamp: float, state: int) -> None:
+        self.times[self.next_idx] = timestamp
+        self.states[self.next_idx] = state
+        self.next_idx = (self.next_idx + 1) % len(self.times)
+        self.size = min(self.size + 1, len(self.times))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Yields (time, state) pairs from the oldest one"""
+        start = (self.next_idx - self.size) % len(self.times)
+        for idx in range(start, start + self.size):
+            idx %= len(self.times)
+            yield self.times[idx], self.states[idx]
+
+    def lines(self) -> list:
+        return [format_state(timestamp, state) for timestamp, state in self]
 
 
 class TrafficLight:
-    def __init__(self, console_logs=False):
+    def __init__(self, console_logs=False, clock=None, log_size=LOG_SIZE):
+        self.clock = clock or SystemClock()
         self.state = 1
-        self.pedestrian_btn = False
+        self.wake_event = threading.Event()  # set by stop and by pressing pedestrian button
+        self.running = True
+        self.pressed = False
         self.car_light = 'red'
         self.pedestrian_light = 'green'
         self.run_time = 0
-        self.init_time = datetime.now()
+        self.init_time = self.clock.now()
         self.console_logs = console_logs
+        self.log = StateLog(log_size)
+
+    @property
+    def pedestrian_btn(self) -> bool:
+        return self.pressed
+
+    @pedestrian_btn.setter
+    def pedestrian_btn(self, pressed: bool) -> None:
+        """Pressing the button wakes up state machine waiting in change_state"""
+        self.pressed = pressed
+        if pressed:
+            self.wake_event.set()
 
     def change_lights(self, state) -> None:
         """Changes lights' colors according to current state"""
-        lights_states = {
-            1: {'pedestrian_light': 'green',
-                'car_light': 'red'},
-            2: {'pedestrian_light': 'red',
-                'car_light': 'green'},
-            3: {'pedestrian_light': 'red',
-                'car_light': 'yellow'}
-        }
         self.state = state
-        self.car_light = lights_states[self.state]['car_light']
-        self.pedestrian_light = lights_states[self.state]['pedestrian_light']
+        self.car_light = TABLE.car_light[state]
+        self.pedestrian_light = TABLE.pedestrian_light[state]
+        self.log.record(self.clock.now() - self.init_time, state)
+        metrics.count('traffic.transitions')
         if self.console_logs:
             print(self.state_info())
 
     def change_state(self, dst_state: int, delay: int) -> None:
-        """Changes state to dst_state after passed delay time"""
-        current_delay = 0
-        timer = datetime.now()
-        while current_delay < delay:
-            passed_time = datetime.now() - timer
-            current_delay = passed_time.seconds
-            if self.state == 2 and self.pedestrian_btn:
-                self.pedestrian_btn = False
-                print('Pedestrian btn clicked!')
+        """Changes state to dst_state after passed delay time,
+        in states with pedestrian_interrupt pedestrian button press changes it immediately"""
+        deadline = self.clock.now() + delay
+        remaining = delay
+        while remaining > 0:
+            if not self.running:
+                return
+            if TABLE.pedestrian_interrupt[self.state] and self.pressed:
+                self.pressed = False
+                if self.console_logs:
+                    print('Pedestrian btn clicked!')
                 break
+            self.clock.wait(self.wake_event, remaining)
+            # flags are set before the event, so wake-ups between waiting and clearing are not lost
+            self.wake_event.clear()
+            remaining = deadline - self.clock.now()
+        if not self.running:
+            return
         self.state = dst_state
-        self.run_time = (datetime.now() - self.init_time).seconds
+        self.run_time = int(self.clock.now() - self.init_time)
         self.change_lights(state=self.state)
 
     def run(self, args=None) -> None:
-        """Runs state machine algorithm"""
+        """Runs state machine algorithm, passing (run time, state) of every transition to update_logs_func"""
         update_logs_func = args['update_logs_func']
-        while True:
-            self.run_time = (datetime.now() - self.init_time).seconds
-            self.change_state(dst_state=2, delay=10)
-            update_logs_func(data=self.state_info())
-            self.change_state(dst_state=3, delay=20)
-            update_logs_func(data=self.state_info())
-            self.change_state(dst_state=1, delay=2)
-            update_logs_func(data=self.state_info())
+        self.running = True
+        self.wake_event.clear()
+        while self.running:
+            self.run_time = int(self.clock.now() - self.init_time)
+            self.change_state(dst_state=TABLE.next_state[self.state], delay=TABLE.delay[self.state])
+            if self.running:
+                update_logs_func((self.run_time, self.state))
+
+    def stop(self) -> None:
+        """Stops run, waking up change_state. Pedestrian button stays pressed"""
+        self.running = False
+        self.wake_event.set()
 
     def state_info(self) -> str:
         """Returns current state information"""
-        return (f'{self.run_time} seconds | State {self.state} -> '
-                f'Pedestrian light: {self.pedestrian_light}'
-                f' | Car light: {self.car_light}')
+        return format_state(self.run_time, self.state)
 
 
 def run_gui(engine):
@@ -69,6 +153,7 @@ def run_gui(engine):
 
 def main():
     # TO ENABLE CONSOLE LOGS CHANGE console_logs argument below to True
+    from PyQt5.QtWidgets import QApplication
     engine = TrafficLight(console_logs=True)
     app = QApplication([])
     run_gui(engine)
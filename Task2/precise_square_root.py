@@ -0,0 +1,77 @@
+import argparse
+import math
+from decimal import Decimal, localcontext
+from typing import Union
+
+GUARD_DIGITS = 10
+FLOAT_DIGITS = 15  # correct digits of the float start point
+
+
+def integer_square_root(n: int) -> int:
+    """Returns the largest integer whose square is <= n.
+    Precision of the root doubles every iteration, so only the last iteration works on full n"""
+    if n < 0:
+        raise Exception(f'Cannot calculate square root of {n}!')
+    if n == 0:
+        return 0
+
+    shift = (n.bit_length() - 1) // 2
+    root = 1
+    root_bits = 0
+    for step in reversed(range(shift.bit_length())):
+        prev_bits = root_bits
+        root_bits = shift >> step
+        # Newton iteration on the top 2 * root_bits bits of n
+        root = (root << (root_bits - prev_bits - 1)) + (n >> (2 * shift - prev_bits - root_bits + 1)) // root
+    return root - (root * root > n)
+
+
+def decimal_square_root(x: Union[Decimal, int, str], digits: int) -> Decimal:
+    """Returns square root of x rounded to given number of significant digits.
+    Iterations start from float approximation and double working precision, up to digits + guard digits"""
+    x = Decimal(x)
+    if x < 0:
+        raise Exception(f'Cannot calculate square root of {x}!')
+    if x == 0:
+        return Decimal(0)
+
+    # x = mantissa * 10^exponent with mantissa in [1, 100), so that float conversion doesn't overflow
+    exponent = x.adjusted() - x.adjusted() % 2
+    root = Decimal(math.sqrt(float(x.scaleb(-exponent)))).scaleb(exponent // 2)
+
+    target_precision = digits + GUARD_DIGITS
+    precision = FLOAT_DIGITS
+    with localcontext() as context:
+        while precision < target_precision:
+            precision = min(2 * precision, target_precision)
+            context.prec = precision
+            root = (root + (+x) / root) / 2  # unary plus rounds x to working precision
+        context.prec = target_precision
+        root = (root + x / root) / 2  # last iteration at full precision corrects rounding errors
+        context.prec = digits
+        return +root
+
+
+def precise_square_root(n: Union[int, Decimal, str], digits: int = None) -> Union[int, Decimal]:
+    """Returns exact integer square root of integer n if digits are not given,
+    otherwise square root rounded to digits significant digits"""
+    if digits is None:
+        if isinstance(n, str):
+            n = int(n)
+        if not isinstance(n, int):
+            raise Exception(f'Exact square root needs n of type int, not {type(n)}')
+        return integer_square_root(n)
+    return decimal_square_root(n, digits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculates square root of huge integers and decimals')
+    parser.add_argument('n', help='integer or decimal number')
+    parser.add_argument('--digits', type=int, default=None,
+                        help='significant digits of the root, integer square root if not given')
+    args = parser.parse_args(argv)
+    print(precise_square_root(args.n, args.digits))
+
+
+if __name__ == "__main__":
+    main()
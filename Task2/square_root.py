@@ -1,10 +1,37 @@
 import numpy as np
 from typing import Union, Any
-from datetime import datetime
-from prettytable import PrettyTable
+import argparse
+import time
+
+from Utils.metrics import metrics
+
+MAX_TRACE_SIZE = 10 ** 6
+AUTO_START_POINT = 'auto'
+SEED_TABLE_SIZE = 256
+# square roots of midpoints of mantissa intervals covering [0.5, 2)
+SEED_TABLE = np.sqrt(0.5 + (np.arange(SEED_TABLE_SIZE) + 0.5) * 1.5 / SEED_TABLE_SIZE)
+
+
+class IterationTrace:
+    """Records iterates and errors into preallocated arrays"""
+
+    def __init__(self, capacity: int):
+        self.iterates = np.empty(capacity)
+        self.errors = np.empty(capacity)
+        self.size = 0
+
+    def record(self, x: float, error: float) -> None:
+        if self.size < self.iterates.size:
+            self.iterates[self.size] = x
+            self.errors[self.size] = error
+            self.size += 1
+
+    def __iter__(self):
+        return zip(self.iterates[:self.size], self.errors[:self.size])
 
 
 def print_run_info(data: dict, method: str) -> None:
+    from prettytable import PrettyTable  # imported only when something is printed
     run_info = PrettyTable()
     run_info.title = f'Calculating square root of n={data["n"]} using {method} method'
     run_info.field_names = ['Epsilon', 'Max iters', 'Start Point', 'Search range']
@@ -28,30 +55,131 @@ def calculate_square_root(params: dict,
     print_run_info(params, method=method)
     assert validate_search_range(n, search_range)
 
+    # iterates are printed after the computation, so that printing is not measured
+    trace = IterationTrace(min(int(max_iters) + 1, MAX_TRACE_SIZE))
+    init_time = time.perf_counter_ns()
+    error, iter_idx, _ = solve_square_root(n, eps, max_iters, x1, search_range, method, trace)
+    elapsed_time = (time.perf_counter_ns() - init_time) // 1000
+    metrics.observe(f'sqrt.{method}.solve', elapsed_time / 1e6)
+
+    for idx, (next_x, next_error) in enumerate(trace):
+        print(f'Iter: {idx}, X: {next_x}, error: {next_error}')
+
+    if converged(error, eps):
+        print(f'Algorithm converged within {iter_idx} iterations. Final error: {error}. \n')
+    else:
+        print('Algorithm failed to converge: amount of steps exceeded max iterations. \n')
+    return error, elapsed_time, iter_idx
+
+
+def converged(error: Union[np.ndarray, float], eps: Union[np.ndarray, float]) -> Union[np.ndarray, bool]:
+    """Checks termination condition error <= eps, shared by all solvers and reports"""
+    return error <= eps
+
+
+def solve_square_root(n: Union[int, float], eps: float, max_iters: Union[int, float], x1: Union[int, float],
+                      search_range: list, method: str = 'newton', trace: IterationTrace = None) -> tuple:
+    """Calculates square root of n like calculate_square_root, without printing anything.
+    Returns final error, number of iterations and the root"""
     error = np.abs(square_root(n) - x1 ** 2)  # initial error
     iter_idx = 0
-    prev_x = x1
-    init_time = datetime.now()
+    next_x = x1
 
-    while error >= eps and iter_idx <= max_iters:
+    while not converged(error, eps) and iter_idx <= max_iters:
         if method == 'newton':
-            next_x = newton_method(n, prev_x)
+            next_x = newton_method(n, next_x)
         else:
             next_x = bisection_method(search_range)
             search_range = [next_x, search_range[1]] if (next_x ** 2 - n) < 0 else [search_range[0], next_x]
 
         error = np.abs(square_root(n) - next_x)
-        prev_x = next_x
-        print(f'Iter: {iter_idx}, X: {next_x}, error: {error}')
+        if trace is not None:
+            trace.record(next_x, error)
+        iter_idx += 1
+    if metrics.enabled:
+        metrics.count(f'sqrt.{method}.solves')
+        metrics.count(f'sqrt.{method}.iterations', iter_idx)
+    return error, iter_idx, next_x
+
+
+def benchmark_square_root(params: dict, method: str = 'newton', repeats: int = 1000, warmup: int = 100) -> dict:
+    """Measures time of solve_square_root over many repeats after warm-up runs.
+    Returns median, 95th percentile and minimum time in nanoseconds, iterations and error"""
+    args = (params['n'], params['epsilon'], params['max iterations'], params['start point'],
+            params['search range'], method)
+    assert validate_search_range(params['n'], params['search range'])
+
+    for _ in range(warmup):
+        solve_square_root(*args)
+    times = np.empty(repeats, dtype=np.int64)
+    for idx in range(repeats):
+        start_time = time.perf_counter_ns()
+        error, iterations, _ = solve_square_root(*args)
+        times[idx] = time.perf_counter_ns() - start_time
+
+    return {'median': round(np.median(times)), 'p95': round(np.percentile(times, 95)), 'min': int(times.min()),
+            'iterations': iterations, 'error': float(error)}
+
+
+def calculate_square_root_batch(n: np.ndarray, epsilon: Union[np.ndarray, float], max_iters: Union[np.ndarray, int],
+                                start_points: np.ndarray = None, search_ranges: np.ndarray = None,
+                                method: str = 'newton') -> tuple:
+    """Calculates square roots of all elements of n using selected method,
+    with the same termination condition as calculate_square_root checked per element.
+    Newton method starts from start_points (initial_guess by default),
+    bisection searches within search_ranges of shape (len(n), 2).
+    Returns arrays of roots, errors and iterations counts"""
+
+    shape = np.shape(n)
+    n = np.asarray(n, dtype=float).ravel()
+    eps = np.broadcast_to(epsilon, shape).ravel()
+    max_iters = np.broadcast_to(max_iters, shape).ravel()
+    expected_roots = square_root(n)
+
+    if start_points is None:
+        start_points = initial_guess(n)
+    roots = np.array(np.broadcast_to(start_points, shape), dtype=float).ravel()
+    if method != 'newton':
+        search_ranges = np.array(search_ranges, dtype=float).reshape(-1, 2)
+        lower, upper = search_ranges[:, 0].copy(), search_ranges[:, 1].copy()
+
+    errors = np.abs(expected_roots - roots ** 2)  # initial error
+    iterations = np.zeros(n.shape, dtype=np.int64)
+    active = np.flatnonzero(~converged(errors, eps) & (iterations <= max_iters))
+
+    # elements which haven't met termination condition yet are kept in compacted arrays
+    n_active, roots_active, expected_active = n[active], roots[active], expected_roots[active]
+    eps_active, max_iters_active = eps[active], max_iters[active]
+    if method != 'newton':
+        lower_active, upper_active = lower[active], upper[active]
+    iter_idx = 0
+    while active.size:
+        if method == 'newton':
+            roots_active = newton_method(n_active, roots_active)
+        else:
+            roots_active = bisection_method([lower_active, upper_active])
+            below_root = (roots_active ** 2 - n_active) < 0
+            lower_active = np.where(below_root, roots_active, lower_active)
+            upper_active = np.where(below_root, upper_active, roots_active)
+        errors_active = np.abs(expected_active - roots_active)
         iter_idx += 1
 
-    elapsed_time = (datetime.now() - init_time).microseconds
+        finished = converged(errors_active, eps_active) | (iter_idx > max_iters_active)
+        if finished.any():
+            roots[active[finished]] = roots_active[finished]
+            errors[active[finished]] = errors_active[finished]
+            iterations[active[finished]] = iter_idx
+            running = ~finished
+            active, n_active, roots_active, expected_active = (active[running], n_active[running],
+                                                               roots_active[running], expected_active[running])
+            eps_active, max_iters_active = eps_active[running], max_iters_active[running]
+            if method != 'newton':
+                lower_active, upper_active = lower_active[running], upper_active[running]
 
-    if error <= eps:
-        print(f'Algorithm converged within {iter_idx} iterations. Final error: {error}. \n')
-    else:
-        print('Algorithm failed to converge: amount of steps exceeded max iterations. \n')
-    return error, elapsed_time, iter_idx
+    if metrics.enabled:
+        metrics.count(f'sqrt.{method}.solves', n.size)
+        metrics.count(f'sqrt.{method}.iterations', int(iterations.sum()))
+    return roots.reshape(shape), errors.reshape(shape), iterations.reshape(shape)
 
 
 def validate_search_range(n: Union[int, float], search_range: list) -> bool:
@@ -64,11 +192,42 @@ def validate_search_range(n: Union[int, float], search_range: list) -> bool:
     return True
 
 
+def validate_batch(n: np.ndarray, epsilon: np.ndarray, max_iters: np.ndarray, search_ranges: np.ndarray) -> tuple:
+    """Validates arrays of parameters like validate_user_input and validate_search_range do for single values.
+    Returns mask of valid elements and array of error messages (empty for valid elements)"""
+    lower, upper = search_ranges[:, 0], search_ranges[:, 1]
+    with np.errstate(invalid='ignore'):
+        checks = [(~np.isfinite(n) | ~np.isfinite(epsilon) | ~np.isfinite(max_iters)
+                   | ~np.isfinite(lower) | ~np.isfinite(upper), 'Parameters should be of type int or float'),
+                  (n < 0, 'Cannot calculate square root of negative n!'),
+                  (epsilon <= 0, 'Epsilon should be greater than 0!'),
+                  (max_iters <= 0, 'Max iterations should be greater than 0!'),
+                  (((lower ** 2 - n) * (upper ** 2 - n) >= 0) | ~(lower <= square_root(n))
+                   | ~(square_root(n) <= upper), 'Root in selected range does not exist!')]
+
+    messages = np.full(n.shape, '', dtype=object)
+    # the first failed check of an element is reported
+    for failed, message in reversed(checks):
+        messages[failed] = message
+    return messages == '', messages
+
+
 def newton_method(n: Union[float, int], x: Union[float, int]) -> float:
     """Returns x calculated using newton method"""
     return 0.5 * (x + n / x)
 
 
+def initial_guess(n: Union[np.ndarray, float]) -> Union[np.ndarray, float]:
+    """Returns start point close to square root of n (relative error below 0.3%):
+    exponent of n is halved and square root of mantissa is taken from lookup table"""
+    mantissa, exponent = np.frexp(n)  # n = mantissa * 2^exponent, mantissa in [0.5, 1)
+    odd_exponent = exponent % 2 == 1
+    mantissa = np.where(odd_exponent, mantissa * 2, mantissa)  # mantissa in [0.5, 2), exponent even
+    exponent = np.where(odd_exponent, exponent - 1, exponent)
+    table_idx = np.clip(((mantissa - 0.5) * (SEED_TABLE_SIZE / 1.5)).astype(np.int64), 0, SEED_TABLE_SIZE - 1)
+    return np.where(n == 0, 0.0, np.ldexp(SEED_TABLE[table_idx], exponent // 2))
+
+
 def square_root(x: Union[int, float]) -> Union[float, int]:
     """Returns square root of x"""
     return np.sqrt(x)
@@ -76,7 +235,7 @@ def square_root(x: Union[int, float]) -> Union[float, int]:
 
 def bisection_method(search_range: list) -> Union[float, int]:
     """Returns x calculated using bisection method"""
-    return np.sum(search_range) / 2
+    return (search_range[0] + search_range[1]) / 2
 
 
 def collect_user_input() -> dict:
@@ -85,7 +244,7 @@ def collect_user_input() -> dict:
     eps = input('Expected maximum error: \n')
     max_iter = input('Maximum number of iterations: \n')
     search_range = input('Enter search range separated by ",": \n')
-    x1 = input('Enter start point: \n')
+    x1 = input(f'Enter start point ("{AUTO_START_POINT}" to compute it from n): \n')
 
     data = {'n': n,
             'epsilon': eps,
@@ -110,6 +269,9 @@ def validate_user_input(data: dict) -> bool:
     parameters_names = ['Number for square root calculation', 'Maximum error', 'Number of max iterations',
                         'Start point for the algorithm']
     for param, param_name in zip(data.keys(), parameters_names):
+        if param == 'start point' and data[param] == AUTO_START_POINT:
+            data[param] = float(initial_guess(data['n']))
+            continue
         data[param] = validate_int_or_float(data[param], param_name)
         if param in ['max iterations', 'epsilon']:
             assert data[param] > 0, f'{param.capitalize()} should be greater than 0!'
@@ -124,19 +286,47 @@ def validate_user_input(data: dict) -> bool:
     return True
 
 
-def main():
-    parameters = collect_user_input()
+def run_benchmark(parameters: dict, repeats: int, warmup: int) -> None:
+    """Prints benchmark summary of both methods"""
+    results = {method: benchmark_square_root(parameters, method, repeats, warmup)
+               for method in ['newton', 'bisection']}
 
+    from prettytable import PrettyTable
     summary = PrettyTable()
-    summary.title = 'Summary'
-    summary.field_names = ['Numerical method', 'Convergence time [\u03BCs]', 'Total iters', 'Error']
+    summary.title = f'Benchmark of {repeats} runs after {warmup} warm-up runs'
+    summary.field_names = ['Numerical method', 'Median [ns]', 'p95 [ns]', 'Min [ns]', 'Total iters', 'Error']
+    for method, result in results.items():
+        summary.add_row([method, result['median'], result['p95'], result['min'], result['iterations'],
+                         result['error']])
+    print(summary)
 
-    for method in ['newton', 'bisection']:
-        error, elapsed_time, iterations = calculate_square_root(params=parameters,
-                                                                method=method)
-        summary.add_row([method, elapsed_time, iterations, error])
 
-    print(summary)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculates square root using Newton and bisection methods')
+    parser.add_argument('--benchmark', action='store_true', help='measures methods without printing iterations')
+    parser.add_argument('--repeats', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--metrics', help='writes iterations counts and timings to JSON (or Prometheus .prom) file')
+    args = parser.parse_args(argv)
+    metrics.enabled = args.metrics is not None
+
+    parameters = collect_user_input()
+    if args.benchmark:
+        run_benchmark(parameters, args.repeats, args.warmup)
+    else:
+        from prettytable import PrettyTable
+        summary = PrettyTable()
+        summary.title = 'Summary'
+        summary.field_names = ['Numerical method', 'Convergence time [\u03BCs]', 'Total iters', 'Error']
+
+        for method in ['newton', 'bisection']:
+            error, elapsed_time, iterations = calculate_square_root(params=parameters,
+                                                                    method=method)
+            summary.add_row([method, elapsed_time, iterations, error])
+
+        print(summary)
+    if args.metrics:
+        metrics.export(args.metrics)
 
 
 if __name__ == "__main__":
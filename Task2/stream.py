@@ -0,0 +1,146 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+from Task2.square_root import calculate_square_root_batch, validate_batch, initial_guess, converged, AUTO_START_POINT
+
+CSV_FIELDS = ['n', 'epsilon', 'max iterations', 'start point', 'search range start', 'search range end']
+RESULT_FIELDS = ['line'] + CSV_FIELDS + ['method', 'root', 'error', 'iterations', 'status']  # line of input
+INVALID_ROW = [np.nan] * len(CSV_FIELDS)
+
+
+def parse_csv_line(line: str) -> list:
+    """Parses a single CSV line, fields which are not numbers become NaN and fail validation"""
+    values = line.replace(AUTO_START_POINT, 'nan').split(',')
+    if len(values) != len(CSV_FIELDS):
+        return INVALID_ROW
+    try:
+        return [float(value) for value in values]
+    except ValueError:
+        return INVALID_ROW
+
+
+def parse_csv_chunk(lines: list) -> np.ndarray:
+    """Returns array of shape (len(lines), 6) with CSV_FIELDS columns, "auto" start point becomes NaN.
+    Whole chunk is parsed at once, lines are parsed separately only if chunk contains a malformed line"""
+    text = ''.join(lines).replace(AUTO_START_POINT, 'nan')
+    try:
+        return np.loadtxt(text.splitlines(), delimiter=',', dtype=float, ndmin=2).reshape(-1, len(CSV_FIELDS))
+    except ValueError:
+        return np.array([parse_csv_line(line) for line in lines], dtype=float).reshape(-1, len(CSV_FIELDS))
+
+
+def parse_jsonl_line(line: str) -> list:
+    """Parses a single JSON line with the same keys as collect_user_input's data,
+    search range is either a list of two numbers or a "start,end" string as in interactive mode"""
+    try:
+        data = json.loads(line)
+        start_point = data.get('start point', AUTO_START_POINT)
+        search_range = data['search range']
+        if isinstance(search_range, str):
+            search_range = search_range.split(',')
+        if len(search_range) != 2:
+            return INVALID_ROW
+        return [float(data['n']), float(data['epsilon']), float(data['max iterations']),
+                np.nan if start_point == AUTO_START_POINT else float(start_point),
+                float(search_range[0]), float(search_range[1])]
+    except (ValueError, TypeError, KeyError, IndexError):
+        return INVALID_ROW
+
+
+def parse_jsonl_chunk(lines: list) -> np.ndarray:
+    return np.array([parse_jsonl_line(line) for line in lines], dtype=float).reshape(-1, len(CSV_FIELDS))
+
+
+PARSERS = {'csv': parse_csv_chunk, 'jsonl': parse_jsonl_chunk}
+
+
+def solve_chunk(params: np.ndarray, methods: list, line_numbers: list = None) -> list:
+    """Validates and solves all rows of params at once, returns result rows for every method.
+    Rows start with their line_numbers, so that invalid rows, which have all params NaN, can be traced to input.
+    "auto" start points (NaN) of valid rows are written as the computed start point"""
+    if line_numbers is None:
+        line_numbers = range(1, len(params) + 1)
+    params = params.copy()
+    n, eps, max_iters = params[:, 0], params[:, 1], params[:, 2]
+    search_ranges = params[:, 4:]
+    valid, messages = validate_batch(n, eps, max_iters, search_ranges)
+    start_points = params[valid, 3]
+    start_points = np.where(np.isnan(start_points), initial_guess(n[valid]), start_points)
+    params[valid, 3] = start_points
+
+    rows = []
+    for method in methods:
+        roots = np.full(n.shape, np.nan)
+        errors = np.full(n.shape, np.nan)
+        iterations = np.zeros(n.shape, dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roots[valid], errors[valid], iterations[valid] = calculate_square_root_batch(
+                n[valid], eps[valid], max_iters[valid], start_points, search_ranges[valid], method)
+        status = np.where(converged(errors, eps), 'converged', 'max iterations exceeded').astype(object)
+        status[~valid] = messages[~valid]
+        rows.extend(zip(line_numbers, *params.T.tolist(), [method] * len(n), roots.tolist(), errors.tolist(),
+                        iterations.tolist(), status.tolist()))
+    return rows
+
+
+def stream_square_roots(lines, output, input_format: str = 'csv', methods: list = ('newton', 'bisection'),
+                        chunk_size: int = 10000, header: bool = None) -> int:
+    """Reads problems from lines in chunks of chunk_size and writes results to output after every chunk.
+    CSV header is detected by default. Returns number of problems"""
+    parse_chunk = PARSERS[input_format]
+    lines = ((line_number, line) for line_number, line in enumerate(lines, 1) if line.strip())
+    writer = csv.writer(output)
+    writer.writerow(RESULT_FIELDS)
+    problems_count = 0
+
+    first_line = next(lines, None)
+    if first_line is None:
+        return 0
+    if header is None:
+        header = input_format == 'csv' and first_line[1].split(',')[0].strip() == CSV_FIELDS[0]
+    pending = [] if header else [first_line]
+
+    while True:
+        chunk = pending + list(islice(lines, chunk_size - len(pending)))
+        pending = []
+        if not chunk:
+            break
+        line_numbers, chunk_lines = zip(*chunk)
+        writer.writerows(solve_chunk(parse_chunk(list(chunk_lines)), list(methods), line_numbers))
+        output.flush()
+        problems_count += len(chunk)
+    return problems_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculates square roots of problems streamed from file or stdin')
+    parser.add_argument('input', nargs='?', default='-', help='CSV or JSON Lines file, "-" for stdin')
+    parser.add_argument('--format', choices=list(PARSERS), default='csv',
+                        help=f'CSV columns: {", ".join(CSV_FIELDS)}; JSON keys as in interactive mode')
+    parser.add_argument('--output', default='-', help='CSV file with results, "-" for stdout')
+    parser.add_argument('--method', choices=['newton', 'bisection', 'both'], default='both')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    methods = ['newton', 'bisection'] if args.method == 'both' else [args.method]
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    start_time = time.perf_counter()
+    try:
+        problems_count = stream_square_roots(input_file, output_file, args.format, methods, args.chunk_size)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f'{problems_count} problems in {time.perf_counter() - start_time:.2f} s', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice, product
+
+import numpy as np
+
+from Task2.square_root import solve_square_root, validate_search_range, initial_guess, converged, AUTO_START_POINT
+
+PARAMETERS = ['n', 'epsilon', 'max iterations', 'start point', 'search range', 'method']
+RESULT_FIELDS = ['n', 'epsilon', 'max iterations', 'start point', 'search range start', 'search range end',
+                 'method', 'iterations', 'error', 'time [ns]', 'status']
+
+
+def parameter_values(values) -> list:
+    """Returns parameter's values: list as it is or {"start", "stop", "num", optional "scale": "log"} spec"""
+    if isinstance(values, dict):
+        space = np.geomspace if values.get('scale') == 'log' else np.linspace
+        return space(values['start'], values['stop'], values['num']).tolist()
+    return values
+
+
+def load_grid(path: str) -> dict:
+    """Loads parameter grid from JSON file, method defaults to both methods"""
+    with open(path) as f:
+        grid = json.load(f)
+    grid.setdefault('method', ['newton', 'bisection'])
+    missing = [param for param in PARAMETERS if param not in grid]
+    if missing:
+        raise Exception(f'Parameter grid should contain {missing} keys!')
+    return {param: parameter_values(grid[param]) for param in PARAMETERS}
+
+
+def generate_cases(grid: dict):
+    """Lazily yields all combinations of grid's parameters"""
+    return product(*(grid[param] for param in PARAMETERS))
+
+
+def run_case(n: float, eps: float, max_iters: int, x1: float, search_range: list, method: str) -> list:
+    """Solves a single case quietly and returns CSV row with the result"""
+    row = [n, eps, max_iters, x1, search_range[0], search_range[1], method]
+    if x1 == AUTO_START_POINT:
+        x1 = float(initial_guess(n))
+    try:
+        validate_search_range(n, search_range)
+    except Exception as e:
+        return row + ['', '', '', str(e)]
+    start_time = time.perf_counter_ns()
+    error, iterations, _ = solve_square_root(n, eps, max_iters, x1, search_range, method)
+    elapsed_time = time.perf_counter_ns() - start_time
+    status = 'converged' if converged(error, eps) else 'max iterations exceeded'
+    return row + [iterations, float(error), elapsed_time, status]
+
+
+def run_chunk(cases: list) -> list:
+    return [run_case(*case) for case in cases]
+
+
+def run_sweep(grid: dict, output_path: str, workers: int = None, chunk_size: int = 1000) -> int:
+    """Runs all cases of the grid in a process pool and appends results to CSV as chunks finish.
+    Only a few chunks per worker are in flight, so memory doesn't depend on grid's size.
+    Returns number of cases"""
+    workers = workers or os.cpu_count()
+    cases = generate_cases(grid)
+    cases_count = 0
+
+    with open(output_path, 'w', newline='') as f, ProcessPoolExecutor(workers) as executor:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_FIELDS)
+        pending = set()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(cases, chunk_size))
+                if not chunk:
+                    break
+                pending.add(executor.submit(run_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows = future.result()
+                writer.writerows(rows)
+                cases_count += len(rows)
+            f.flush()
+    return cases_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Runs square root methods over a grid of parameters')
+    parser.add_argument('grid', help='JSON file with list of values (or start, stop, num spec) for each parameter')
+    parser.add_argument('--output', default='sweep.csv')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    cases_count = run_sweep(load_grid(args.grid), args.output, args.workers, args.chunk_size)
+    print(f'{cases_count} cases in {time.perf_counter() - start_time:.2f} s written to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
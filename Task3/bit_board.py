@@ -0,0 +1,136 @@
+import numpy as np
+
+from Task3.game_elements import Board
+from Utils.metrics import metrics
+
+WORD_BITS = 64
+BLOCK_WORDS = 2 ** 20  # words processed at once while packing, counting and computing next generation
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)  # alive cells in a byte
+
+ONE = np.uint64(1)
+TOP_BIT = np.uint64(WORD_BITS - 1)
+
+
+class BitBoard:
+    def __init__(self, board: np.array):
+        board = np.asarray(board, dtype=np.uint8)
+        self.shape = board.shape
+        self.board = self.pack(board)
+
+    def __repr__(self):
+        return '\n'.join([str(x) for x in self.states.tolist()])
+
+    @classmethod
+    def empty(cls, rows: int, cols: int):
+        """Creates board of dead cells without allocating a dense array"""
+        bit_board = cls.__new__(cls)
+        bit_board.shape = (rows, cols)
+        bit_board.board = np.zeros((rows, -(-cols // WORD_BITS)), dtype='<u8')
+        return bit_board
+
+    @classmethod
+    def from_live_cells(cls, shape: tuple, rows: np.array, cols: np.array):
+        """Creates board of given shape with alive cells at rows, cols without allocating a dense array"""
+        bit_board = cls.empty(*shape)
+        cols = np.asarray(cols, dtype=np.int64)
+        np.bitwise_or.at(bit_board.board, (rows, cols // WORD_BITS), ONE << (cols % WORD_BITS).astype(np.uint64))
+        return bit_board
+
+    @classmethod
+    def from_board(cls, board: Board):
+        """Creates bit board from Board of cells"""
+        return cls(board.states)
+
+    @classmethod
+    def from_initial_pose(cls, initial_pose: list):
+        """Creates bit board from initial_pose list stored in config"""
+        return cls(np.array(initial_pose))
+
+    def to_board(self) -> Board:
+        """Returns Board of cells with the same states"""
+        return Board(self.states)
+
+    def to_initial_pose(self) -> list:
+        """Returns states as list in config's initial_pose format"""
+        return self.states.tolist()
+
+    @staticmethod
+    def pack(states: np.array) -> np.array:
+        """Packs every row of states into 64-bit words, column c is bit c % 64 of word c // 64.
+        Rows are packed in blocks straight into the words, so no padded copy of states is made"""
+        rows, cols = states.shape
+        words = np.zeros((rows, -(-cols // WORD_BITS)), dtype='<u8')
+        row_bytes = words.view(np.uint8)
+        block_rows = max(1, BLOCK_WORDS // max(1, words.shape[1]))
+        for start in range(0, rows, block_rows):
+            packed = np.packbits(states[start:start + block_rows], axis=1, bitorder='little')
+            row_bytes[start:start + block_rows, :packed.shape[1]] = packed
+        return words
+
+    @property
+    def states(self) -> np.array:
+        """Returns cells' states as an array of 0s and 1s"""
+        bits = np.unpackbits(self.board.view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :self.shape[1]]
+
+    @property
+    def population(self) -> int:
+        """Returns number of alive cells"""
+        block_rows = max(1, BLOCK_WORDS // max(1, self.board.shape[1]))
+        return sum(int(POPCOUNT[self.board[start:start + block_rows].view(np.uint8)].sum(dtype=np.int64))
+                   for start in range(0, self.shape[0], block_rows))
+
+    def compute_next(self, new_board) -> None:
+        """Writes the next generation of this board into new_board"""
+        rows, cols = self.shape
+        last_bit = np.uint64((cols - 1) % WORD_BITS)
+        last_word_mask = np.uint64((1 << (int(last_bit) + 1)) - 1)
+        block_rows = max(1, BLOCK_WORDS // self.board.shape[1])
+        # phases of all blocks are summed into a single observation per generation
+        count_timer = metrics.accumulator('gol.count_neighbours')
+        rules_timer = metrics.accumulator('gol.apply_rules')
+
+        for start in range(0, rows, block_rows):
+            stop = min(start + block_rows, rows)
+            with count_timer:
+                # block with one halo row above and below (periodic boundary conditions)
+                block = self.board[np.arange(start - 1, stop + 1) % rows]
+
+                west = block << ONE  # west[c] = block[c - 1]
+                west[:, 1:] |= block[:, :-1] >> TOP_BIT
+                west[:, 0] |= (block[:, -1] >> last_bit) & ONE
+
+                east = block >> ONE  # east[c] = block[c + 1]
+                east[:, :-1] |= block[:, 1:] << TOP_BIT
+                east[:, -1] |= (block[:, 0] & ONE) << last_bit
+
+                # sums of three cells in a row, as two-bit numbers
+                row_ones = west ^ block ^ east
+                row_twos = (west & block) | (east & (west ^ block))
+                middle_ones = west[1:-1] ^ east[1:-1]
+                middle_twos = west[1:-1] & east[1:-1]
+
+                # adding rows above, middle and below, count modulo 8 as bits: ones, twos, fours
+                above_ones, below_ones = row_ones[:-2], row_ones[2:]
+                above_twos, below_twos = row_twos[:-2], row_twos[2:]
+                ones = above_ones ^ middle_ones ^ below_ones
+                ones_carry = (above_ones & middle_ones) | (below_ones & (above_ones ^ middle_ones))
+                twos_sum = above_twos ^ middle_twos ^ below_twos
+                twos_carry = (above_twos & middle_twos) | (below_twos & (above_twos ^ middle_twos))
+                twos = twos_sum ^ ones_carry
+                fours = twos_carry ^ (twos_sum & ones_carry)
+
+            with rules_timer:
+                alive = block[1:-1]
+                next_block = twos & ~fours & (ones | alive)
+                next_block[:, -1] &= last_word_mask
+                new_board.board[start:stop] = next_block
+        count_timer.observe()
+        rules_timer.observe()
+
+    def update_board(self, new_board) -> bool:
+        """Updates board by coping temp board"""
+        if isinstance(new_board, BitBoard):
+            np.copyto(self.board, new_board.board)
+            return True
+        return False
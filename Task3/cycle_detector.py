@@ -0,0 +1,162 @@
+from collections import deque, namedtuple
+
+import numpy as np
+
+from Task3.bit_board import BitBoard, WORD_BITS
+
+MAX_PERIOD = 64
+BLOCK_WORDS = 2 ** 14  # words hashed at once, so that hashing large boards allocates little memory
+CycleInfo = namedtuple('CycleInfo', ['kind', 'period', 'start_generation'])  # kind: extinction, still life or cycle
+
+# splitmix64 constants
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def word_keys(indices: np.array, words: np.array, seed: int = 0) -> np.array:
+    """Returns pseudo-random 64-bit Zobrist keys of words with given values at given indices.
+    Keys are computed instead of stored, so that large boards don't need a table of keys"""
+    z = indices.astype(np.uint64)
+    z += np.uint64(seed + 1)
+    z *= GOLDEN_GAMMA
+    z += words
+    z ^= z >> np.uint64(30)
+    z *= MIX_1
+    z ^= z >> np.uint64(27)
+    z *= MIX_2
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def board_cells(board) -> np.array:
+    """Returns array holding board's cells: words of bit board, states of other boards"""
+    return board.board if isinstance(board, BitBoard) else board.states
+
+
+def words_shape(board, cells: np.array) -> tuple:
+    """Returns board's shape in 64-bit words"""
+    if isinstance(board, BitBoard):
+        return cells.shape
+    return cells.shape[0], -(-cells.shape[1] // WORD_BITS)
+
+
+def region_words(board, cells: np.array, rows: slice, word_cols: slice) -> np.array:
+    """Returns words of given rows and word columns, packed like BitBoard's: column c is bit c % 64 of word c // 64.
+    Words of bit board are returned without copying, states of other boards are packed"""
+    if isinstance(board, BitBoard):
+        return cells[rows, word_cols]
+    region = cells[rows, word_cols.start * WORD_BITS:word_cols.stop * WORD_BITS]
+    packed = np.zeros((region.shape[0], (word_cols.stop - word_cols.start) * 8), dtype=np.uint8)
+    packed[:, :-(-region.shape[1] // 8)] = np.packbits(region, axis=1, bitorder='little')
+    return packed.view('<u8')
+
+
+def row_blocks(shape: tuple):
+    """Yields (rows, word columns) slices covering board of given shape in words, about BLOCK_WORDS words each"""
+    block_rows = max(1, BLOCK_WORDS // shape[1])
+    for start in range(0, shape[0], block_rows):
+        yield slice(start, min(start + block_rows, shape[0])), slice(0, shape[1])
+
+
+def changed_regions(board, shape: tuple):
+    """Yields (rows, word columns) slices of regions which may differ from the previous generation:
+    spans of changed tiles of tiled board in each row of tiles, the whole board otherwise"""
+    changed_tiles = getattr(board, 'changed_tiles', None)
+    if changed_tiles is None:
+        yield from row_blocks(shape)
+        return
+    for tile_row in np.flatnonzero(changed_tiles.any(axis=1)):
+        tile_cols = np.flatnonzero(changed_tiles[tile_row])
+        row_start = tile_row * board.tile_size
+        yield (slice(row_start, min(row_start + board.tile_size, shape[0])),
+               slice(tile_cols[0] * board.tile_size // WORD_BITS,
+                     min(-(-(tile_cols[-1] + 1) * board.tile_size // WORD_BITS), shape[1])))
+
+
+def region_indices(local: np.array, rows: slice, word_cols: slice, region_cols: int, row_length: int) -> np.array:
+    """Converts flat indices of region's words to flat indices of board's words"""
+    if region_cols == row_length:
+        return local + rows.start * row_length
+    return (rows.start + local // region_cols) * row_length + word_cols.start + local % region_cols
+
+
+def board_hash(board, seed: int = 0, empty: bool = False) -> int:
+    """Returns XOR of keys of all board's words, or of words of empty board of the same size"""
+    cells = board_cells(board)
+    shape = words_shape(board, cells)
+    board_hash = 0
+    for rows, word_cols in row_blocks(shape):
+        words = region_words(board, cells, rows, word_cols).reshape(-1)
+        if empty:
+            words = np.zeros_like(words)
+        indices = region_indices(np.arange(words.size), rows, word_cols, shape[1], shape[1])
+        board_hash ^= int(np.bitwise_xor.reduce(word_keys(indices, words, seed)))
+    return board_hash
+
+
+class CycleDetector:
+    """Detects extinction, still lifes and cycles up to max_period generations long
+    by remembering Zobrist hashes of the last max_period generations.
+    Hash is updated only from regions of the board which changed since the previous generation.
+    Hash matches are confirmed on boards, so that hash collisions don't end runs: extinction and still lifes at once,
+    cycles with a single snapshot taken at the match, which has to repeat one period later"""
+
+    def __init__(self, max_period: int = MAX_PERIOD, seed: int = 0):
+        self.max_period = max_period
+        self.seed = seed
+        self.hash = None
+        self.empty_hash = None  # hash of board without alive cells
+        self.hashes = deque()  # (hash, generation) of the last max_period generations
+        self.generations = {}  # hash: generation
+        self.candidate = None  # (CycleInfo, snapshot of cells, generation of confirmation)
+
+    def reset(self, board, generation: int = 0) -> None:
+        """Starts detection from given generation's board"""
+        self.hash = board_hash(board, self.seed)
+        self.empty_hash = board_hash(board, self.seed, empty=True)
+        self.hashes.clear()
+        self.generations = {}
+        self.candidate = None
+        self.remember(generation)
+
+    def remember(self, generation: int) -> None:
+        self.hashes.append((self.hash, generation))
+        self.generations[self.hash] = generation
+        if len(self.hashes) > self.max_period:
+            old_hash, old_generation = self.hashes.popleft()
+            if self.generations.get(old_hash) == old_generation:
+                del self.generations[old_hash]
+
+    def update(self, board, previous_board, generation: int) -> CycleInfo:
+        """Updates hash with words of board which differ from previous_board, the previous generation.
+        Returns CycleInfo once generation is confirmed to repeat an earlier one, otherwise None"""
+        cells, previous_cells = board_cells(board), board_cells(previous_board)
+        shape = words_shape(board, cells)
+        for rows, word_cols in changed_regions(board, shape):
+            words = region_words(board, cells, rows, word_cols)
+            previous_words = region_words(previous_board, previous_cells, rows, word_cols)
+            local = np.flatnonzero(words != previous_words)
+            if local.size:
+                indices = region_indices(local, rows, word_cols, words.shape[1], shape[1])
+                changed_keys = word_keys(indices, words.reshape(-1)[local], self.seed)
+                changed_keys ^= word_keys(indices, previous_words.reshape(-1)[local], self.seed)
+                self.hash ^= int(np.bitwise_xor.reduce(changed_keys))
+
+        if self.hash == self.empty_hash and not cells.any():
+            return CycleInfo('extinction', 1, generation)
+        if self.candidate is not None:
+            cycle, snapshot, confirmation_generation = self.candidate
+            if generation == confirmation_generation:
+                self.candidate = None
+                if np.array_equal(cells, snapshot):
+                    return cycle
+        elif self.hash in self.generations:
+            start_generation = self.generations[self.hash]
+            period = generation - start_generation
+            if period > 1:
+                self.candidate = (CycleInfo('cycle', period, start_generation), cells.copy(), generation + period)
+            elif np.array_equal(cells, previous_cells):
+                return CycleInfo('still life', 1, start_generation)
+        self.remember(generation)
+        return None
@@ -1,5 +1,6 @@
 import numpy as np
-from copy import deepcopy
+
+from Utils.metrics import metrics
 
 
 class Cell:
@@ -7,14 +8,9 @@ class Cell:
         self.row = row
         self.col = col
         self.state = state
-        self.prev_state = None
-        self.prev_neighbors = None
-        self.neighbours = None
 
     def count_neighbours(self, board: np.array) -> int:
         """Counts neighbours surrounding the specific cell"""
-        # save previous neighbours
-        self.prev_neighbors = self.neighbours
         # Periodic boundary conditions
         row1 = board.shape[0] - 1 if self.row == 0 else self.row - 1
         row3 = 0 if self.row == board.shape[0] - 1 else self.row + 1
@@ -22,16 +18,14 @@ class Cell:
         col1 = board.shape[1] - 1 if self.col == 0 else self.col - 1
         col3 = 0 if self.col == board.shape[1] - 1 else self.col + 1
 
-        rows = [row1, self.row, row3]
-        cols = [col1, self.col, col3]
-
-        self.neighbours = np.array([[board[row, col].state for col in cols] for row in rows])
-        return np.sum(self.neighbours) if self.state == 0 else (np.sum(self.neighbours) - 1)
+        return (board[row1, col1].state + board[row1, self.col].state + board[row1, col3].state
+                + board[self.row, col1].state + board[self.row, col3].state
+                + board[row3, col1].state + board[row3, self.col].state + board[row3, col3].state)
 
 
 class Board:
     def __init__(self, board: np.array):
-        self.board = np.array([[Cell(row, col, state=board[row, col])
+        self.board = np.array([[Cell(row, col, state=int(board[row, col]))
                                 for col in range(board.shape[1])]
                                for row in range(board.shape[0])], dtype='object')
 
@@ -40,9 +34,71 @@ class Board:
                       for row in range(self.board.shape[0])]
         return '\n'.join([str(x) for x in board_repr])
 
+    @property
+    def states(self) -> np.array:
+        """Returns cells' states as an array of 0s and 1s"""
+        return np.array([[cell.state for cell in row] for row in self.board], dtype=np.uint8)
+
     def update_board(self, new_board) -> bool:
-        """Updates board by coping temp board"""
+        """Updates board by coping cells' states of temp board"""
         if isinstance(new_board, Board):
-            self.board = deepcopy(new_board.board)
+            for cell, new_cell in zip(self.board.flat, new_board.board.flat):
+                cell.state = new_cell.state
+            return True
+        return False
+
+
+def count_stripe_neighbours(stripe: np.array, above: np.array, below: np.array,
+                            column_sums: np.array, neighbours: np.array) -> np.array:
+    """Counts neighbours of stripe's cells in place into preallocated buffers of stripe's shape,
+    above and below are the rows next to the stripe, columns wrap around (periodic boundary conditions)"""
+    np.copyto(column_sums, stripe)
+    column_sums[1:] += stripe[:-1]
+    column_sums[0] += above
+    column_sums[:-1] += stripe[1:]
+    column_sums[-1] += below
+
+    np.copyto(neighbours, column_sums)
+    neighbours[:, 1:] += column_sums[:, :-1]
+    neighbours[:, 0] += column_sums[:, -1]
+    neighbours[:, :-1] += column_sums[:, 1:]
+    neighbours[:, -1] += column_sums[:, 0]
+    neighbours -= stripe
+    return neighbours
+
+
+class ArrayBoard:
+    def __init__(self, board: np.array):
+        self.board = np.array(board, dtype=np.uint8)
+        # preallocated buffers, so computing next generation does not allocate memory
+        self.column_sums = np.empty_like(self.board)
+        self.neighbours = np.empty_like(self.board)
+
+    def __repr__(self):
+        return '\n'.join([str(x) for x in self.board.tolist()])
+
+    @property
+    def states(self) -> np.array:
+        """Returns cells' states as an array of 0s and 1s"""
+        return self.board
+
+    def count_neighbours(self) -> np.array:
+        """Counts neighbours of all cells at once"""
+        # Periodic boundary conditions
+        return count_stripe_neighbours(self.board, self.board[-1], self.board[0], self.column_sums, self.neighbours)
+
+    def compute_next(self, new_board) -> None:
+        """Writes the next generation of this board into new_board"""
+        with metrics.timer('gol.count_neighbours'):
+            neighbours = self.count_neighbours()
+        with metrics.timer('gol.apply_rules'):
+            # cell is alive in the next generation if it has 3 neighbours or it is alive and has 2 neighbours
+            np.bitwise_or(neighbours, self.board, out=neighbours)
+            np.equal(neighbours, 3, out=new_board.board, casting='unsafe')
+
+    def update_board(self, new_board) -> bool:
+        """Updates board by coping temp board"""
+        if isinstance(new_board, ArrayBoard):
+            np.copyto(self.board, new_board.board)
             return True
         return False
@@ -1,10 +1,60 @@
-from PyQt5.QtWidgets import QVBoxLayout, QPushButton, QDialog, QGroupBox, QGridLayout, QButtonGroup, QTextEdit
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtWidgets import QVBoxLayout, QPushButton, QDialog, QGroupBox, QGridLayout, QButtonGroup, QWidget
+from PyQt5.QtCore import Qt, QSize, QPointF
+from PyQt5.QtGui import QImage, QPainter
 import numpy as np
 
-from Utils.utils import Worker, CustomThread
+from Utils.utils import UpdateChannel, LogView, worker_pool
 from game_of_life import GameEngine
 
+MAX_BUTTONS_SIZE = 50  # larger boards are rendered as an image
+MAX_FPS = 60
+CELL_COLORS = np.array([255, 0], dtype=np.uint8)  # grayscale of dead and alive cells
+
+
+class BoardView(QWidget):
+    """Displays board as a single image, zoomed with mouse wheel and panned by dragging"""
+
+    def __init__(self, frame: np.array):
+        super().__init__()
+        self.zoom = max(1.0, 600 / max(frame.shape))
+        self.offset = QPointF(0, 0)
+        self.drag_start = None
+        self.setMinimumSize(400, 400)
+        self.set_frame(frame)
+
+    def set_frame(self, frame: np.array) -> None:
+        """Shows frame of grayscale pixels, one per cell"""
+        self.frame = np.ascontiguousarray(frame)  # image uses frame's memory
+        self.image = QImage(self.frame.data, self.frame.shape[1], self.frame.shape[0], self.frame.strides[0],
+                            QImage.Format_Grayscale8)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.gray)
+        painter.translate(self.offset)
+        painter.scale(self.zoom, self.zoom)
+        painter.drawImage(0, 0, self.image)
+
+    def wheelEvent(self, event):
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        # keeps cell under the cursor in place
+        cursor = event.position()
+        self.offset = cursor - (cursor - self.offset) * factor
+        self.zoom *= factor
+        self.update()
+
+    def mousePressEvent(self, event):
+        self.drag_start = event.pos() - self.offset
+
+    def mouseMoveEvent(self, event):
+        if self.drag_start is not None:
+            self.offset = QPointF(event.pos() - self.drag_start)
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        self.drag_start = None
+
 
 class GUI(QDialog):
     def __init__(self, console_logs):
@@ -15,8 +65,14 @@ class GUI(QDialog):
         self.width = 200
         self.height = 150
         self.engine = GameEngine('./config.json', console_logs=console_logs)
-        self.worker = Worker(self.engine.run, update_gui_func=self.update_grid_colors)
-        self.threading = CustomThread(worker=self.worker)
+        states = self.engine.cells_board.states
+        self.render_mode = self.engine.config.get('render', 'image' if max(states.shape) > MAX_BUTTONS_SIZE
+                                                  else 'buttons')
+        # frames which GUI can't keep up with are dropped
+        self.frames_channel = UpdateChannel(max_rate=MAX_FPS, latest_only=True)
+        self.frames_channel.updates_ready.connect(self.update_grid_colors)
+        self.task = None
+        self.cycle_reported = False
         self.init_ui()
 
     def init_ui(self):
@@ -37,9 +93,8 @@ class GUI(QDialog):
         control_box_layout = QGridLayout()
         control_box_layout.addWidget(self.start_button, 0, 0)
 
-        self.info_area = QTextEdit()
+        self.info_area = LogView()
         self.info_area.setObjectName('Console logs')
-        self.info_area.setReadOnly(True)
 
         control_box_layout.addWidget(self.info_area, 1, 0)
         self.control_box.setLayout(control_box_layout)
@@ -52,16 +107,43 @@ class GUI(QDialog):
         if btn.text() == 'Start':
             self.start_button.setEnabled(False)
             self.engine.running = True
-            self.threading.run_task()  # runs iteration computation
+            # runs iteration computation in background thread
+            self.task = worker_pool().submit(self.run_engine, on_cancel=self.engine.stop)
+
+    def run_engine(self):
+        """Runs the game in engine's thread and releases its boards when it stops"""
+        try:
+            self.engine.run({'update_gui_func': self.publish_frame})
+        finally:
+            self.engine.close()
 
-    def update_grid_colors(self, iter_time):
-        """Updates cells' colors according to the actual state"""
-        for row in range(self.buttons.shape[0]):
-            for col in range(self.buttons.shape[1]):
-                color = 'black' if self.engine.cells_board.board[row, col].state == 1 else 'white'
-                self.buttons[row, col].setStyleSheet(f'background-color : {color}')
-        self.info_area.append(f'Iter time: {iter_time} [\u03BCs]')
-        self.info_area.ensureCursorVisible()
+    def publish_frame(self, iter_time):
+        """Sends current generation to GUI's thread, called from engine's thread"""
+        if not self.frames_channel.is_pending():
+            self.frames_channel.publish((CELL_COLORS[self.engine.cells_board.states], iter_time))
+
+    def update_grid_colors(self, frames: list):
+        """Updates cells' colors according to the latest frame"""
+        frame, iter_time = frames[-1]
+        if self.render_mode == 'image':
+            self.board_view.set_frame(frame)
+        else:
+            for row in range(self.buttons.shape[0]):
+                for col in range(self.buttons.shape[1]):
+                    color = 'black' if frame[row, col] == CELL_COLORS[1] else 'white'
+                    self.buttons[row, col].setStyleSheet(f'background-color : {color}')
+        lines = [f'Iter time: {iter_time} [\u03BCs]']
+        if self.engine.cycle is not None and not self.cycle_reported:
+            self.cycle_reported = True
+            lines.append(self.engine.cycle_info())
+        self.info_area.append_lines(lines)
+
+    def closeEvent(self, event):
+        if self.task is not None:
+            self.task.cancel()  # engine is closed when its run ends
+        else:
+            self.engine.close()
+        super().closeEvent(event)
 
     def create_grid_layout(self):
         """Creates grid layout for cells"""
@@ -70,21 +152,25 @@ class GUI(QDialog):
         layout = QGridLayout()
         layout.setVerticalSpacing(0)
         layout.setHorizontalSpacing(0)
+        states = self.engine.cells_board.states
+
+        if self.render_mode == 'image':
+            self.board_view = BoardView(CELL_COLORS[states])
+            layout.addWidget(self.board_view, 0, 0)
+            self.horizontal_group_box.setLayout(layout)
+            return
 
         # Adding cells represented as non-clickable buttons to the layout
         temp_buttons = []
-        for row in range(self.engine.cells_board.board.shape[0]):
-            for col in range(self.engine.cells_board.board.shape[1]):
-                cell = self.engine.cells_board.board[row, col]
-
+        for row in range(states.shape[0]):
+            for col in range(states.shape[1]):
                 btn = QPushButton()
                 btn.setFixedSize(QSize(20, 20))
-                btn_color = 'black' if cell.state == 1 else 'white'
+                btn_color = 'black' if states[row, col] == 1 else 'white'
                 btn.setStyleSheet(f'background-color : {btn_color}')
                 btn.setEnabled(False)
-                layout.addWidget(btn, cell.row, cell.col)
+                layout.addWidget(btn, row, col)
                 temp_buttons.append(btn)
 
-        self.buttons = np.array(temp_buttons).reshape(self.engine.cells_board.board.shape[0],
-                                                      self.engine.cells_board.board.shape[1])
+        self.buttons = np.array(temp_buttons).reshape(states.shape[0], states.shape[1])
         self.horizontal_group_box.setLayout(layout)
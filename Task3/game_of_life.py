@@ -1,12 +1,33 @@
 import numpy as np
-from datetime import datetime
+import argparse
 import json
+import os
 import time
 import sys
 
-from PyQt5.QtWidgets import QApplication
+from Task3.game_elements import Cell, Board, ArrayBoard
+from Task3.bit_board import BitBoard
+from Task3.tiled_board import TiledBoard
+from Task3.hashlife import HashLife
+from Task3.history import HistoryWriter
+from Task3.cycle_detector import CycleDetector, MAX_PERIOD
+from Task3.patterns import load_live_cells, dense_board
+from Utils.metrics import metrics
 
-from Task3.game_elements import Cell, Board
+
+def parallel_board(board: np.array, workers: int = None):
+    """Creates ParallelBoard, multiprocessing is imported only if parallel engine is used"""
+    from Task3.parallel_board import ParallelBoard
+    return ParallelBoard(board, workers)
+
+
+ENGINES = {'cells': Board,
+           'numpy': ArrayBoard,
+           'bits': BitBoard,
+           'tiled': TiledBoard,
+           'hashlife': ArrayBoard,
+           'parallel': parallel_board}
+MAX_PRINTED_SIZE = 64  # larger boards are summarized instead of printed
 
 
 class GameEngine:
@@ -15,53 +36,150 @@ class GameEngine:
             self.config = json.load(f)
 
         assert self.validate_config()
-        self.init_array = np.array(self.config['initial_pose'])
+        shape, rows, cols = load_live_cells(self.config['initial_pose'], os.path.dirname(config_path))
         self.refresh_rate = self.config['refresh_rate']
-        self.cells_board = Board(self.init_array)
-        self.temp_board = Board(self.init_array)
+        self.engine = self.config.get('engine', 'cells')
+        if (self.engine == 'hashlife' and self.config.get('hashlife_mode', 'torus') == 'torus'
+                and any(dim & (dim - 1) for dim in shape)):
+            raise Exception(f'Board dimensions should be powers of two for hashlife engine in torus mode, '
+                            f'not {shape}')
+        if self.engine == 'bits':
+            # bit boards are built from alive cells, so large sparse patterns never take rows * cols bytes
+            self.cells_board = BitBoard.from_live_cells(shape, rows, cols)
+            self.temp_board = BitBoard.empty(*shape)
+        else:
+            init_array = dense_board(shape, rows, cols)
+            board_options = {'workers': self.config.get('workers')} if self.engine == 'parallel' else {}
+            self.cells_board = ENGINES[self.engine](init_array, **board_options)
+            self.temp_board = ENGINES[self.engine](init_array, **board_options)
+        self.hashlife = None
+        self.hashlife_states = None  # board written by hashlife's last advance, to notice external edits
         self.running = False
         self.console_logs = console_logs
+        self.generation = 0
+        # max_period 0 disables detection of extinction, still lifes and cycles
+        max_period = self.config.get('max_period', MAX_PERIOD)
+        self.cycle_detector = CycleDetector(max_period) if max_period else None
+        self.stop_on_cycle = self.config.get('stop_on_cycle', True)
+        self.cycle = None
 
     def validate_config(self) -> bool:
         """Validates game config"""
         if 'initial_pose' not in self.config.keys() or 'refresh_rate' not in self.config.keys():
             raise Exception('Config file should contain initial_pose and refresh_rate keys!')
-        if not isinstance(self.config['initial_pose'], list):
-            raise Exception(f'Initial pose array should be of type: list, not {type(self.config["initial_pose"])}')
+        if not isinstance(self.config['initial_pose'], (list, dict)):
+            raise Exception(f'Initial pose should be of type: list or dict, not {type(self.config["initial_pose"])}')
+        if isinstance(self.config['initial_pose'], dict):
+            initial_pose_keys = self.config['initial_pose'].keys()
+            if 'pattern' not in initial_pose_keys and not {'rows', 'cols', 'live_cells'} <= initial_pose_keys:
+                raise Exception('Initial pose should contain pattern key or rows, cols and live_cells keys!')
         if not isinstance(self.config['refresh_rate'], int):
             raise Exception(f'Refresh rate should be of type int, not {self.config["refresh_rate"]}')
+        if self.config.get('engine', 'cells') not in ENGINES:
+            raise Exception(f'Engine should be one of: {list(ENGINES.keys())}, not {self.config["engine"]}')
+        if self.config.get('hashlife_mode', 'torus') not in ['torus', 'plane']:
+            raise Exception(f'Hashlife mode should be torus or plane, not {self.config["hashlife_mode"]}')
+        if not isinstance(self.config.get('max_period', MAX_PERIOD), int) or self.config.get('max_period', 0) < 0:
+            raise Exception(f'Max period should be non-negative int, not {self.config["max_period"]}')
 
         return True
 
     def compute_iter(self) -> None:
         """Computes game iteration"""
-        for row in range(self.cells_board.board.shape[0]):
-            for col in range(self.cells_board.board.shape[1]):
-                current_cell = self.cells_board.board[row, col]
-                neighbours_count = current_cell.count_neighbours(self.cells_board.board)
+        metrics.count('gol.generations')
+        with metrics.timer('gol.compute'):
+            if not isinstance(self.cells_board, Board):
+                self.cells_board.compute_next(self.temp_board)
+                return
 
-                self.apply_game_rules(neighbours_count, current_cell)
+            # all neighbours are counted before rules are applied, so that both phases are timed
+            with metrics.timer('gol.count_neighbours'):
+                neighbours_counts = [[cell.count_neighbours(self.cells_board.board) for cell in row]
+                                     for row in self.cells_board.board]
+            with metrics.timer('gol.apply_rules'):
+                for row, row_counts in zip(self.cells_board.board, neighbours_counts):
+                    for current_cell, neighbours_count in zip(row, row_counts):
+                        self.apply_game_rules(neighbours_count, current_cell)
+
+    def advance(self, generations: int, until_cycle: bool = False) -> int:
+        """Advances game by given number of generations, at once if hashlife engine is selected.
+        Hashlife's universe is kept between calls, so that cells which left the board's window in plane mode
+        come back the same way however generations are split, and reloaded only if the board was edited.
+        With until_cycle stops early at generation which repeats an earlier one.
+        Returns number of advanced generations"""
+        if self.engine != 'hashlife':
+            for generation in range(generations):
+                self.compute_iter()
+                self.swap_boards()
+                if self.detect_cycle() and until_cycle:
+                    return generation + 1
+            return generations
+
+        if self.hashlife is None:
+            self.hashlife = HashLife(self.cells_board.states, mode=self.config.get('hashlife_mode', 'torus'))
+        elif not np.array_equal(self.cells_board.states, self.hashlife_states):
+            self.hashlife.load(self.cells_board.states)
+        with metrics.timer('gol.hashlife_advance'):
+            self.hashlife.advance(generations)
+        metrics.count('gol.generations', generations)
+        self.hashlife_states = self.hashlife.states
+        self.cells_board.board[...] = self.hashlife_states
+        self.generation += generations  # cycles are not detected across hashlife's jumps
+        return generations
+
+    def detect_cycle(self) -> bool:
+        """Counts the generation just swapped into cells_board and looks for it among the previous ones.
+        Returns True when a cycle is found for the first time"""
+        self.generation += 1
+        if self.cycle_detector is None or self.cycle is not None:
+            return False
+        if self.cycle_detector.hash is None:
+            self.cycle_detector.reset(self.temp_board, self.generation - 1)
+        self.cycle = self.cycle_detector.update(self.cells_board, self.temp_board, self.generation)
+        if self.cycle is None:
+            return False
+        metrics.count(f'gol.{self.cycle.kind}')
+        return True
+
+    def cycle_info(self) -> str:
+        """Returns description of found cycle"""
+        if self.cycle.kind == 'extinction':
+            return f'All cells died in generation {self.cycle.start_generation}'
+        if self.cycle.kind == 'still life':
+            return f'Board is still since generation {self.cycle.start_generation}'
+        return f'Cycle of period {self.cycle.period} starting in generation {self.cycle.start_generation}'
 
     def run(self, kwargs) -> None:
         """Runs the whole game"""
         while self.running:
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             self.compute_iter()
-            assert self.cells_board.update_board(self.temp_board)
+            self.swap_boards()
             elapsed_time = self.measure_iter_time(start_time)
-            if self.console_logs:
-                self.print_iter(elapsed_time)
+            cycle_found = self.detect_cycle()
+            with metrics.timer('gol.render'):
+                if self.console_logs:
+                    self.print_iter(elapsed_time)
+                    if cycle_found:
+                        print(self.cycle_info())
+                update_gui_func = kwargs['update_gui_func']
+                update_gui_func(elapsed_time)
+            if cycle_found and self.stop_on_cycle:
+                self.running = False
+                break
             time.sleep(self.refresh_rate)
-            update_gui_func = kwargs['update_gui_func']
-            update_gui_func(elapsed_time)
+
+    def stop(self) -> None:
+        """Stops run after current generation"""
+        self.running = False
+
+    def swap_boards(self) -> None:
+        """Makes computed temp board the current one, previous board is reused for the next generation"""
+        with metrics.timer('gol.swap'):
+            self.cells_board, self.temp_board = self.temp_board, self.cells_board
 
     def apply_game_rules(self, neighbours_count: int, cell: Cell) -> None:
         """Apply Game Of Life main rules to current cells generation"""
-        # early termination condition
-        neighbours_changes = cell.neighbours == cell.prev_neighbors
-        if cell.state == cell.prev_state and not neighbours_changes.all():
-            return
-
         if neighbours_count in [2, 3] and cell.state == 1:
             self.temp_board.board[cell.row, cell.col].state = 1
         elif cell.state == 0 and neighbours_count == 3:
@@ -69,14 +187,25 @@ class GameEngine:
         else:
             self.temp_board.board[cell.row, cell.col].state = 0
 
+    def close(self) -> None:
+        """Releases shared memory of parallel boards"""
+        for board in [self.cells_board, self.temp_board]:
+            if hasattr(board, 'close'):
+                board.close()
+
     @staticmethod
-    def measure_iter_time(start_time: datetime.time) -> int:
-        """Measures elapsed time since start_time"""
-        return (datetime.now() - start_time).microseconds
+    def measure_iter_time(start_time: float) -> int:
+        """Measures elapsed time in microseconds since start_time of time.perf_counter"""
+        return int((time.perf_counter() - start_time) * 1e6)
 
     def print_iter(self, elapsed_time: int) -> None:
         """Prints current iteration array and elapsed time"""
-        print(f'{self.cells_board} \n Iter time: {elapsed_time} [\u03BCs]')
+        states = self.cells_board.states
+        if max(states.shape) > MAX_PRINTED_SIZE:
+            print(f'Board {states.shape[0]}x{states.shape[1]}, population: {np.count_nonzero(states)} '
+                  f'\n Iter time: {elapsed_time} [\u03BCs]')
+        else:
+            print(f'{self.cells_board} \n Iter time: {elapsed_time} [\u03BCs]')
 
 
 def run_gui(console_logs):
@@ -84,7 +213,87 @@ def run_gui(console_logs):
     window = GUI(console_logs=console_logs)
 
 
-def main():
+def save_snapshot(engine: GameEngine, output_dir: str, generation: int) -> None:
+    """Saves current board's states as .npy file"""
+    np.save(os.path.join(output_dir, f'generation_{generation:08d}.npy'), engine.cells_board.states)
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    """Runs the game without GUI and reports its throughput"""
+    engine = GameEngine(args.config)
+    if args.max_period is not None:
+        engine.cycle_detector = CycleDetector(args.max_period) if args.max_period else None
+    engine.stop_on_cycle = not args.keep_running
+    metrics.enabled = args.metrics is not None
+    os.makedirs(args.output_dir, exist_ok=True)
+    history = None
+    if args.history:
+        history = HistoryWriter(args.history, engine.cells_board.states.shape, args.keyframe_interval)
+        history.write(0, engine.cells_board.states)
+    # without sleeping generations between snapshots are computed at once (hashlife engine jumps over them)
+    step = (args.snapshot_every or args.generations) if args.no_sleep and history is None else 1
+
+    cells = engine.cells_board.states.size  # parallel boards can't be read after closing
+    generation = 0
+    compute_time = 0
+    try:
+        while generation < args.generations:
+            start_time = time.perf_counter()
+            generations = engine.advance(min(step, args.generations - generation), until_cycle=engine.stop_on_cycle)
+            compute_time += time.perf_counter() - start_time
+            generation += generations
+
+            if history is not None:
+                history.write(generation, engine.cells_board.states)
+            if args.snapshot_every and generation % args.snapshot_every == 0:
+                save_snapshot(engine, args.output_dir, generation)
+            if engine.cycle is not None and engine.stop_on_cycle:
+                break
+            if not args.no_sleep:
+                time.sleep(engine.refresh_rate)
+        save_snapshot(engine, args.output_dir, generation)
+        if history is not None:
+            history.close()
+    finally:
+        engine.close()
+
+    generations_per_second = generation / compute_time if compute_time else float('inf')
+    print(f'{generation} generations in {compute_time:.3f} s | '
+          f'{generations_per_second:.1f} generations/s | '
+          f'{generations_per_second * cells:.3e} cell updates/s')
+    if engine.cycle is not None:
+        print(engine.cycle_info())
+    if args.metrics:
+        metrics.export(args.metrics)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Game of Life')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('gui', help='runs the game with GUI (default)')
+    run_parser = subparsers.add_parser('run', help='runs the game without GUI')
+    run_parser.add_argument('--config', default=os.path.join(os.path.dirname(__file__), 'config.json'))
+    run_parser.add_argument('--generations', type=int, required=True)
+    run_parser.add_argument('--no-sleep', action='store_true', help='ignores refresh_rate')
+    run_parser.add_argument('--snapshot-every', type=int, default=0, help='saves board every N generations')
+    run_parser.add_argument('--output-dir', default='snapshots')
+    run_parser.add_argument('--history', help='writes every generation to the history file')
+    run_parser.add_argument('--keyframe-interval', type=int, default=100, help='frames between history keyframes')
+    run_parser.add_argument('--max-period', type=int, default=None,
+                            help='longest detected cycle, 0 disables detection '
+                                 f'(config\'s max_period or {MAX_PERIOD})')
+    run_parser.add_argument('--keep-running', action='store_true', help='only reports found cycle')
+    run_parser.add_argument('--metrics', help='writes phases\' timings to JSON (or Prometheus .prom) file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'run':
+        run_batch(args)
+        return
+
+    from PyQt5.QtWidgets import QApplication
     # TO PRINT CONSOLE LOGS CHANGE console_logs argument in run_gui method to True
     app = QApplication([])
     run_gui(console_logs=True)
@@ -0,0 +1,210 @@
+import numpy as np
+
+MAX_CACHE_SIZE = 2 ** 20
+
+
+class Node:
+    """Quadtree node covering 2^level x 2^level cells"""
+    __slots__ = ('nw', 'ne', 'sw', 'se', 'level', 'population')
+
+    def __init__(self, nw, ne, sw, se, level: int, population: int):
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+OFF = Node(None, None, None, None, level=0, population=0)
+ON = Node(None, None, None, None, level=0, population=1)
+
+
+class HashLife:
+    """Hashlife universe: hash-consed quadtree with memoized results.
+
+    In 'torus' mode board's dimensions have to be powers of two and periodic boundary conditions
+    are the same as in Cell.count_neighbours. In 'plane' mode the board is placed on an infinite
+    plane of dead cells, so patterns may leave the board's window and states shows only the window."""
+
+    def __init__(self, board: np.array, mode: str = 'torus', max_cache_size: int = MAX_CACHE_SIZE):
+        if mode not in ['torus', 'plane']:
+            raise Exception(f'Hashlife mode should be torus or plane, not {mode}')
+        self.mode = mode
+        self.max_cache_size = max_cache_size
+        self.nodes = {}
+        self.results = {}
+        self.empty_nodes = [OFF]
+        self.generation = 0
+        self.load(board)
+
+    def load(self, board: np.array) -> None:
+        """Replaces universe's cells with board, keeping computed results"""
+        board = np.asarray(board, dtype=np.uint8)
+        self.shape = board.shape
+        size = max(board.shape)
+        level = max(2, (size - 1).bit_length())
+        if self.mode == 'torus':
+            if any(dim & (dim - 1) for dim in board.shape):
+                raise Exception(f'Board dimensions should be powers of two in torus mode, not {board.shape}')
+            # board is repeated up to root's size, which doesn't change evolution of the torus
+            board = np.tile(board, ((1 << level) // board.shape[0], (1 << level) // board.shape[1]))
+        padded = np.zeros((1 << level, 1 << level), dtype=np.uint8)
+        padded[:board.shape[0], :board.shape[1]] = board
+        self.root = self.build(padded, level)
+        self.origin = 0  # row and column of root's top-left cell
+
+    @property
+    def states(self) -> np.array:
+        """Returns cells' states of the board's window as an array of 0s and 1s"""
+        board = np.zeros(self.shape, dtype=np.uint8)
+        self.fill(board, self.root, self.origin, self.origin)
+        return board
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """Returns canonical node made of four quadrants"""
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            node = Node(nw, ne, sw, se, nw.level + 1,
+                        nw.population + ne.population + sw.population + se.population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> Node:
+        """Returns node of dead cells"""
+        while len(self.empty_nodes) <= level:
+            child = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(child, child, child, child))
+        return self.empty_nodes[level]
+
+    def build(self, board: np.array, level: int) -> Node:
+        """Builds quadtree from 2^level x 2^level array"""
+        if level == 0:
+            return ON if board[0, 0] else OFF
+        if not board.any():
+            return self.empty(level)
+        half = 1 << (level - 1)
+        return self.join(self.build(board[:half, :half], level - 1), self.build(board[:half, half:], level - 1),
+                         self.build(board[half:, :half], level - 1), self.build(board[half:, half:], level - 1))
+
+    def fill(self, board: np.array, node: Node, row: int, col: int) -> None:
+        """Writes node's alive cells placed at row, col into the board, skipping cells outside of it"""
+        size = 1 << node.level
+        if (node.population == 0 or row >= board.shape[0] or col >= board.shape[1]
+                or row + size <= 0 or col + size <= 0):
+            return
+        if node.level == 0:
+            board[row, col] = 1
+            return
+        half = size >> 1
+        self.fill(board, node.nw, row, col)
+        self.fill(board, node.ne, row, col + half)
+        self.fill(board, node.sw, row + half, col)
+        self.fill(board, node.se, row + half, col + half)
+
+    def life_4x4(self, node: Node) -> Node:
+        """Returns centre 2x2 of 4x4 node after one generation"""
+        cells = [[node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+                 [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+                 [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+                 [node.sw.sw, node.sw.se, node.se.sw, node.se.se]]
+        states = [[cell.population for cell in row] for row in cells]
+
+        next_cells = []
+        for row in [1, 2]:
+            for col in [1, 2]:
+                neighbours = sum(states[r][c] for r in range(row - 1, row + 2)
+                                 for c in range(col - 1, col + 2)) - states[row][col]
+                alive = neighbours == 3 or (neighbours == 2 and states[row][col] == 1)
+                next_cells.append(ON if alive else OFF)
+        return self.join(*next_cells)
+
+    def successor(self, node: Node, step: int) -> Node:
+        """Returns centre of the node (one level lower) after 2^min(step, level - 2) generations"""
+        if node.population == 0:
+            return node.nw
+        step = min(step, node.level - 2)
+        key = (node, step)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self.life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # nine overlapping subnodes, advanced by 2^step generations (or 2^(level - 3) if step is maximal)
+            c1 = self.successor(self.join(nw.nw, nw.ne, nw.sw, nw.se), step)
+            c2 = self.successor(self.join(nw.ne, ne.nw, nw.se, ne.sw), step)
+            c3 = self.successor(self.join(ne.nw, ne.ne, ne.sw, ne.se), step)
+            c4 = self.successor(self.join(nw.sw, nw.se, sw.nw, sw.ne), step)
+            c5 = self.successor(self.join(nw.se, ne.sw, sw.ne, se.nw), step)
+            c6 = self.successor(self.join(ne.sw, ne.se, se.nw, se.ne), step)
+            c7 = self.successor(self.join(sw.nw, sw.ne, sw.sw, sw.se), step)
+            c8 = self.successor(self.join(sw.ne, se.nw, sw.se, se.sw), step)
+            c9 = self.successor(self.join(se.nw, se.ne, se.sw, se.se), step)
+
+            if step < node.level - 2:
+                result = self.join(self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                                   self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                                   self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                                   self.join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                result = self.join(self.successor(self.join(c1, c2, c4, c5), step),
+                                   self.successor(self.join(c2, c3, c5, c6), step),
+                                   self.successor(self.join(c4, c5, c7, c8), step),
+                                   self.successor(self.join(c5, c6, c8, c9), step))
+
+        if len(self.results) >= self.max_cache_size:
+            self.evict()
+        self.results[key] = result
+        return result
+
+    def evict(self) -> None:
+        """Drops memoized results and the nodes table, nodes in use stay valid but are no longer shared"""
+        self.results.clear()
+        self.nodes.clear()
+        self.empty_nodes = [OFF]
+
+    def expand(self) -> None:
+        """Surrounds root with dead cells, doubling its size"""
+        empty = self.empty(self.root.level - 1)
+        self.root = self.join(self.join(empty, empty, empty, self.root.nw),
+                              self.join(empty, empty, self.root.ne, empty),
+                              self.join(empty, self.root.sw, empty, empty),
+                              self.join(self.root.se, empty, empty, empty))
+        self.origin -= 1 << (self.root.level - 2)
+
+    def is_padded(self) -> bool:
+        """Checks if all alive cells are in the centre quarter of the root"""
+        return (self.root.nw.population == self.root.nw.se.se.population
+                and self.root.ne.population == self.root.ne.sw.sw.population
+                and self.root.sw.population == self.root.sw.ne.ne.population
+                and self.root.se.population == self.root.se.nw.nw.population)
+
+    def step(self, step: int) -> None:
+        """Advances universe by 2^step generations"""
+        if self.mode == 'torus':
+            if step > self.root.level:
+                raise Exception(f'Torus of level {self.root.level} can be advanced by at most '
+                                f'2^{self.root.level} generations at once')
+            # torus is tiled 4x4, centre of the result is aligned with tiles
+            tiles = self.join(self.root, self.root, self.root, self.root)
+            self.root = self.successor(self.join(tiles, tiles, tiles, tiles), step).nw
+        else:
+            while self.root.level < step + 3 or not self.is_padded():
+                self.expand()
+            self.origin += 1 << (self.root.level - 2)
+            self.root = self.successor(self.root, step)
+        self.generation += 1 << step
+
+    def advance(self, generations: int) -> None:
+        """Advances universe by given number of generations"""
+        max_step = self.root.level if self.mode == 'torus' else None
+        while generations > 0:
+            step = generations.bit_length() - 1
+            if max_step is not None:
+                step = min(step, max_step)
+            self.step(step)
+            generations -= 1 << step
@@ -0,0 +1,210 @@
+import mmap
+import queue
+import struct
+import threading
+
+import numpy as np
+
+# file: header, frames, index of frames, footer
+HEADER = struct.Struct('<4sHIII')  # magic, version, rows, cols, keyframe interval
+FRAME_HEADER = struct.Struct('<BQI')  # frame kind, generation, payload size
+INDEX_ENTRY = np.dtype([('kind', '<u1'), ('generation', '<u8'), ('offset', '<u8')])
+FOOTER = struct.Struct('<QQ4s')  # index offset, frames count, magic
+MAGIC = b'GOLH'
+INDEX_MAGIC = b'GOLI'
+VERSION = 1
+
+KEYFRAME = 0
+DELTA = 1
+MAX_ZERO_GAP = 8  # zero bytes kept inside a literal run instead of starting a new run
+PUT_TIMEOUT = 0.1  # s between checks if the writing thread failed while the queue is full
+
+
+def pack_states(states: np.array) -> np.array:
+    """Packs board's states to bytes, 8 cells per byte"""
+    return np.packbits(states, axis=None, bitorder='little')
+
+
+def unpack_states(packed: np.array, shape: tuple) -> np.array:
+    """Unpacks bytes made by pack_states to board's states"""
+    return np.unpackbits(packed, count=shape[0] * shape[1], bitorder='little').reshape(shape)
+
+
+def encode_delta(packed: np.array, prev_packed: np.array) -> bytes:
+    """Encodes difference between two packed boards as runs of changed bytes"""
+    changes = packed ^ prev_packed
+    changed = np.flatnonzero(changes)
+    if changed.size == 0:
+        return struct.pack('<I', 0)
+
+    breaks = np.flatnonzero(np.diff(changed) > MAX_ZERO_GAP)
+    starts = changed[np.concatenate([[0], breaks + 1])]
+    lengths = changed[np.concatenate([breaks, [changed.size - 1]])] + 1 - starts
+    runs = np.empty((starts.size, 2), dtype='<u4')
+    runs[:, 0] = starts
+    runs[:, 1] = lengths
+    return struct.pack('<I', starts.size) + runs.tobytes() + changes[run_indices(starts, lengths)].tobytes()
+
+
+def decode_delta(payload: memoryview, prev_packed: np.array) -> np.array:
+    """Applies runs made by encode_delta to the previous packed board"""
+    runs_count, = struct.unpack_from('<I', payload)
+    packed = prev_packed.copy()
+    if runs_count:
+        runs = np.frombuffer(payload, dtype='<u4', count=2 * runs_count, offset=4).reshape(-1, 2)
+        changes = np.frombuffer(payload, dtype=np.uint8, offset=4 + runs.nbytes)
+        packed[run_indices(runs[:, 0].astype(np.int64), runs[:, 1].astype(np.int64))] ^= changes
+    return packed
+
+
+def run_indices(starts: np.array, lengths: np.array) -> np.array:
+    """Returns indices of all bytes covered by the runs"""
+    run_offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) + np.repeat(starts - run_offsets, lengths)
+
+
+class HistoryWriter:
+    """Writes board's generations to a history file in a background thread"""
+
+    def __init__(self, path: str, shape: tuple, keyframe_interval: int = 100, queue_size: int = 64):
+        if not isinstance(keyframe_interval, int) or keyframe_interval <= 0:
+            raise Exception(f'Keyframe interval should be positive int, not {keyframe_interval}')
+        self.file = open(path, 'wb')
+        self.shape = shape
+        self.keyframe_interval = keyframe_interval
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.index = []
+        self.error = None  # exception which stopped the writing thread
+        self.file.write(HEADER.pack(MAGIC, VERSION, shape[0], shape[1], keyframe_interval))
+        self.thread = threading.Thread(target=self.write_frames, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, generation: int, states: np.array) -> None:
+        """Queues board's states for writing, blocks only if the writer is far behind.
+        Raises exception of the writing thread if it failed"""
+        self.put((generation, pack_states(states)))
+
+    def put(self, frame) -> None:
+        """Queues frame, checking for failure of the writing thread, which would never empty the full queue"""
+        while True:
+            self.check_error()
+            try:
+                self.frames.put(frame, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def check_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def write_frames(self) -> None:
+        """Writes queued frames, stores exception which stops the thread so that write and close raise it"""
+        try:
+            self.write_queued_frames()
+        except Exception as error:
+            self.error = error
+
+    def write_queued_frames(self) -> None:
+        """Encodes and writes queued frames until None is queued"""
+        prev_packed = None
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            generation, packed = frame
+
+            if len(self.index) % self.keyframe_interval == 0:
+                kind, payload = KEYFRAME, packed.tobytes()
+            else:
+                kind, payload = DELTA, encode_delta(packed, prev_packed)
+            self.index.append((kind, generation, self.file.tell()))
+            self.file.write(FRAME_HEADER.pack(kind, generation, len(payload)))
+            self.file.write(payload)
+            prev_packed = packed
+
+    def close(self) -> None:
+        """Writes remaining frames and the index of frames. Index is not written if writing frames failed"""
+        try:
+            self.put(None)
+            self.thread.join()
+            self.check_error()
+            index_offset = self.file.tell()
+            self.file.write(np.array(self.index, dtype=INDEX_ENTRY).tobytes())
+            self.file.write(FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        finally:
+            self.file.close()
+
+
+class HistoryReader:
+    """Reads generations from a history file without loading the whole file"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, self.keyframe_interval = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f'{path} is not a Game of Life history file')
+        self.shape = (rows, cols)
+        self.index = self.read_index()
+        self.keyframes = np.flatnonzero(self.index['kind'] == KEYFRAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.index.size
+
+    @property
+    def generations(self) -> np.array:
+        return self.index['generation']
+
+    def read_index(self) -> np.array:
+        """Reads index of frames from the footer, or scans frames if the file was not closed properly.
+        Index is copied, so that arrays derived from it don't keep the file mapped"""
+        if len(self.data) >= HEADER.size + FOOTER.size:
+            index_offset, frames_count, magic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                return np.frombuffer(self.data, dtype=INDEX_ENTRY, count=frames_count, offset=index_offset).copy()
+
+        index = []
+        offset = HEADER.size
+        while offset + FRAME_HEADER.size <= len(self.data):
+            kind, generation, size = FRAME_HEADER.unpack_from(self.data, offset)
+            if offset + FRAME_HEADER.size + size > len(self.data):
+                break  # frame was not written completely
+            index.append((kind, generation, offset))
+            offset += FRAME_HEADER.size + size
+        return np.array(index, dtype=INDEX_ENTRY)
+
+    def payload(self, frame: int) -> memoryview:
+        offset = int(self.index['offset'][frame])
+        _, _, size = FRAME_HEADER.unpack_from(self.data, offset)
+        start = offset + FRAME_HEADER.size
+        return memoryview(self.data)[start:start + size]
+
+    def read(self, generation: int) -> np.array:
+        """Returns board's states of given generation"""
+        frame = int(np.searchsorted(self.generations, generation))
+        if frame == len(self) or self.generations[frame] != generation:
+            raise Exception(f'Generation {generation} is not stored in the history')
+
+        keyframe = int(self.keyframes[np.searchsorted(self.keyframes, frame, side='right') - 1])
+        packed = np.frombuffer(self.payload(keyframe), dtype=np.uint8)
+        for delta_frame in range(keyframe + 1, frame + 1):
+            packed = decode_delta(self.payload(delta_frame), packed)
+        return unpack_states(packed, self.shape)
+
+    def close(self) -> None:
+        self.index = None
+        self.keyframes = None
+        self.data.close()
@@ -0,0 +1,99 @@
+import os
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from Task3.game_elements import ArrayBoard, count_stripe_neighbours
+from Utils.metrics import metrics
+
+pools = {}  # process pools shared by all parallel boards, by number of workers
+attached_boards = {}  # shared memory attached in a worker process, by name, only of boards used by the last task
+stripe_buffers = []  # preallocated column sums and neighbours buffers of a worker process
+
+
+def get_pool(workers: int) -> Pool:
+    """Returns process pool with given number of workers, created on first use"""
+    if workers not in pools:
+        pools[workers] = Pool(workers)
+    return pools[workers]
+
+
+def close_pools() -> None:
+    """Terminates all process pools"""
+    for pool in pools.values():
+        pool.terminate()
+        pool.join()
+    pools.clear()
+
+
+def attach_board(name: str, shape: tuple) -> np.array:
+    """Returns board stored in shared memory, attaching it once per worker process"""
+    if name not in attached_boards:
+        shared_memory = SharedMemory(name=name)
+        attached_boards[name] = (shared_memory, np.ndarray(shape, dtype=np.uint8, buffer=shared_memory.buf))
+    return attached_boards[name][1]
+
+
+def detach_boards(keep_names: set) -> None:
+    """Closes shared memory of boards other than keep_names, so that boards closed by the main process
+    don't stay mapped in long-lived workers"""
+    for name in [name for name in attached_boards if name not in keep_names]:
+        shared_memory, board = attached_boards.pop(name)
+        del board
+        shared_memory.close()
+
+
+def compute_stripe(board_name: str, new_board_name: str, shape: tuple, start: int, stop: int) -> tuple:
+    """Writes the next generation of rows start:stop into the new board.
+    Returns times of counting neighbours and applying rules in seconds, metrics of workers are not collected"""
+    detach_boards({board_name, new_board_name})
+    board = attach_board(board_name, shape)
+    new_board = attach_board(new_board_name, shape)
+
+    start_time = time.perf_counter()
+    # halo rows above and below the stripe (periodic boundary conditions) are read in place
+    stripe = board[start:stop]
+    column_sums, neighbours = stripe_buffers_of(stripe.shape)
+    count_stripe_neighbours(stripe, board[(start - 1) % shape[0]], board[stop % shape[0]], column_sums, neighbours)
+    count_time = time.perf_counter()
+    # cell is alive in the next generation if it has 3 neighbours or it is alive and has 2 neighbours
+    np.bitwise_or(neighbours, stripe, out=neighbours)
+    np.equal(neighbours, 3, out=new_board[start:stop], casting='unsafe')
+    return count_time - start_time, time.perf_counter() - count_time
+
+
+def stripe_buffers_of(shape: tuple) -> tuple:
+    """Returns worker's preallocated column sums and neighbours buffers of given stripe's shape,
+    buffers are reallocated only for wider or taller stripes"""
+    if not stripe_buffers or stripe_buffers[0].shape[1] != shape[1] or stripe_buffers[0].shape[0] < shape[0]:
+        stripe_buffers[:] = [np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8)]
+    return stripe_buffers[0][:shape[0]], stripe_buffers[1][:shape[0]]
+
+
+class ParallelBoard(ArrayBoard):
+    def __init__(self, board: np.array, workers: int = None):
+        board = np.asarray(board, dtype=np.uint8)
+        self.workers = workers or os.cpu_count()
+        self.shared_memory = SharedMemory(create=True, size=max(1, board.nbytes))
+        self.board = np.ndarray(board.shape, dtype=np.uint8, buffer=self.shared_memory.buf)
+        self.board[...] = board
+        boundaries = np.linspace(0, board.shape[0], min(self.workers, board.shape[0]) + 1).astype(int)
+        self.stripes = list(zip(boundaries[:-1].tolist(), boundaries[1:].tolist()))
+
+    def compute_next(self, new_board) -> None:
+        """Writes the next generation of this board into new_board, one horizontal stripe per worker"""
+        tasks = [(self.shared_memory.name, new_board.shared_memory.name, self.board.shape, start, stop)
+                 for start, stop in self.stripes]
+        phase_times = get_pool(self.workers).starmap(compute_stripe, tasks)
+        # phases' times are summed over workers, so they add up to CPU time rather than to wall time
+        count_times, rules_times = zip(*phase_times)
+        metrics.observe('gol.count_neighbours', sum(count_times))
+        metrics.observe('gol.apply_rules', sum(rules_times))
+
+    def close(self) -> None:
+        """Releases board's shared memory"""
+        del self.board
+        self.shared_memory.close()
+        self.shared_memory.unlink()
@@ -0,0 +1,149 @@
+import os
+import re
+from itertools import islice
+
+import numpy as np
+
+RLE_HEADER = re.compile(r'x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?')
+RLE_TOKEN = re.compile(r'(\d*)([A-Za-z$!])')
+SUPPORTED_RULES = ['B3/S23', '23/3']
+LIFE_106_HEADER = '#Life 1.06'
+CHUNK_LINES = 65536  # lines of Life 1.06 file parsed at once
+
+
+def load_initial_pose(initial_pose, config_dir: str = '.') -> np.array:
+    """Returns board array from config's initial_pose: dense list of lists,
+    sparse dict {"rows", "cols", "live_cells": [[row, col], ...]}
+    or pattern file dict {"pattern", optional "format", "rows", "cols", "row", "col"}.
+    Raises ValueError if the pattern goes past the board"""
+    if isinstance(initial_pose, list):
+        return np.array(initial_pose, dtype=np.uint8)
+    return dense_board(*load_live_cells(initial_pose, config_dir))
+
+
+def load_live_cells(initial_pose, config_dir: str = '.') -> tuple:
+    """Returns (board's shape, rows, cols of alive cells) from config's initial_pose of any format,
+    so that boards which don't store cells densely are built without rows * cols bytes array.
+    Raises ValueError if the pattern goes past the board"""
+    if isinstance(initial_pose, list):
+        board = np.array(initial_pose, dtype=np.uint8)
+        return (board.shape, *np.nonzero(board))
+
+    if 'live_cells' in initial_pose:
+        shape = (initial_pose['rows'], initial_pose['cols'])
+        live_cells = np.array(initial_pose['live_cells'], dtype=np.int64).reshape(-1, 2)
+        if live_cells.size and (live_cells.min() < 0 or (live_cells.max(axis=0) >= shape).any()):
+            raise ValueError(f'Live cells up to {live_cells.max(axis=0).tolist()} do not fit board of size '
+                             f'{shape[0]}x{shape[1]}')
+        return shape, live_cells[:, 0], live_cells[:, 1]
+
+    path = os.path.join(config_dir, initial_pose['pattern'])
+    pattern_format = initial_pose.get('format', os.path.splitext(path)[1].lstrip('.').lower())
+    shape = (initial_pose['rows'], initial_pose['cols']) if 'rows' in initial_pose else None
+    offset = (initial_pose.get('row', 0), initial_pose.get('col', 0))
+    if pattern_format == 'rle':
+        return rle_live_cells(path, shape, offset)
+    if pattern_format in ['lif', 'life', 'life106']:
+        return life_106_live_cells(path, shape, offset)
+    raise Exception(f'Pattern format should be rle or life106, not {pattern_format}')
+
+
+def dense_board(shape: tuple, rows: np.array, cols: np.array) -> np.array:
+    """Returns uint8 board of given shape with alive cells at rows, cols"""
+    board = np.zeros(shape, dtype=np.uint8)
+    board[rows, cols] = 1
+    return board
+
+
+def load_rle(path: str, shape: tuple = None, offset: tuple = (0, 0)) -> np.array:
+    """Loads RLE pattern into board of given shape (pattern's size by default)
+    with pattern's top-left corner at offset"""
+    return dense_board(*rle_live_cells(path, shape, offset))
+
+
+def rle_live_cells(path: str, shape: tuple = None, offset: tuple = (0, 0)) -> tuple:
+    """Reads RLE pattern line by line, returns (board's shape, rows, cols of alive cells)
+    for board of given shape (pattern's size by default) with pattern's top-left corner at offset"""
+    board_shape = None
+    runs = []  # (row, col, length) of runs of alive cells
+    row, col = offset
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if board_shape is None:
+                header = RLE_HEADER.match(line)
+                if header is None:
+                    raise Exception(f'RLE file {path} should start with "x = ..., y = ..." header')
+                if header.group(3) and header.group(3).upper() not in SUPPORTED_RULES:
+                    raise Exception(f'Only B3/S23 rule is supported, not {header.group(3)}')
+                width, height = int(header.group(1)), int(header.group(2))
+                board_shape = tuple(shape or (height + offset[0], width + offset[1]))
+                continue
+
+            for count, tag in RLE_TOKEN.findall(line):
+                count = int(count) if count else 1
+                if tag == '!':
+                    return (board_shape, *expand_runs(runs))
+                if tag == '$':
+                    row += count
+                    col = offset[1]
+                elif tag == 'b':
+                    col += count
+                else:  # 'o' and states of multi-state patterns are alive cells
+                    if row >= board_shape[0] or col + count > board_shape[1]:
+                        raise ValueError(f'RLE pattern {path} of declared size {height}x{width} has alive cells '
+                                         f'up to row {row}, col {col + count - 1}, past board of size '
+                                         f'{board_shape[0]}x{board_shape[1]}')
+                    runs.append((row, col, count))
+                    col += count
+    if board_shape is None:
+        raise Exception(f'RLE file {path} has no header')
+    return (board_shape, *expand_runs(runs))
+
+
+def expand_runs(runs: list) -> tuple:
+    """Returns rows, cols of cells of (row, col, length) runs"""
+    runs = np.array(runs, dtype=np.int64).reshape(-1, 3)
+    lengths = runs[:, 2]
+    run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cols = np.repeat(runs[:, 1], lengths) + np.arange(lengths.sum()) - run_starts
+    return np.repeat(runs[:, 0], lengths), cols
+
+
+def load_life_106(path: str, shape: tuple = None, offset: tuple = (0, 0)) -> np.array:
+    """Loads Life 1.06 pattern into board of given shape (pattern's size by default),
+    with pattern's top-left corner at offset"""
+    return dense_board(*life_106_live_cells(path, shape, offset))
+
+
+def life_106_live_cells(path: str, shape: tuple = None, offset: tuple = (0, 0)) -> tuple:
+    """Reads Life 1.06 pattern ("x y" per alive cell), returns (board's shape, rows, cols of alive cells)
+    for board of given shape (pattern's size by default) with pattern's top-left corner at offset"""
+    chunks = []
+    with open(path) as f:
+        if f.readline().strip() != LIFE_106_HEADER:
+            raise Exception(f'Life 1.06 file {path} should start with {LIFE_106_HEADER} header')
+        while True:
+            lines = list(islice(f, CHUNK_LINES))
+            if not lines:
+                break
+            values = ' '.join(line for line in lines if not line.startswith('#')).split()
+            chunks.append(np.array(values, dtype=np.int64).reshape(-1, 2))
+
+    cells = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int64)
+    cols, rows = cells[:, 0], cells[:, 1]
+    if cells.size:
+        rows, cols = rows - rows.min(), cols - cols.min()
+    pattern_shape = (rows.max(initial=-1) + 1, cols.max(initial=-1) + 1)
+    board_shape = tuple(shape or (pattern_shape[0] + offset[0], pattern_shape[1] + offset[1]))
+    check_fits(path, pattern_shape, board_shape, offset)
+    return board_shape, rows + offset[0], cols + offset[1]
+
+
+def check_fits(path: str, pattern_shape: tuple, board_shape: tuple, offset: tuple) -> None:
+    """Raises ValueError if pattern placed at offset goes past the board"""
+    if pattern_shape[0] + offset[0] > board_shape[0] or pattern_shape[1] + offset[1] > board_shape[1]:
+        raise ValueError(f'Pattern {path} of size {pattern_shape[0]}x{pattern_shape[1]} at row {offset[0]}, '
+                         f'col {offset[1]} does not fit board of size {board_shape[0]}x{board_shape[1]}')
@@ -0,0 +1,59 @@
+import numpy as np
+
+from Task3.game_elements import ArrayBoard
+from Utils.metrics import metrics
+
+TILE_SIZE = 64
+
+
+class TiledBoard(ArrayBoard):
+    def __init__(self, board: np.array, tile_size: int = TILE_SIZE):
+        super().__init__(board)
+        self.tile_size = tile_size
+        tiles_shape = (-(-self.board.shape[0] // tile_size), -(-self.board.shape[1] // tile_size))
+        # tiles which may change in the next generation, all of them at the beginning
+        self.active = np.ones(tiles_shape, dtype=bool)
+        self.changed_tiles = None  # tiles which differ from the previous generation, None if not known
+
+    def compute_next(self, new_board) -> None:
+        """Writes the next generation of this board into new_board, recomputing only active tiles.
+        Inactive tiles of new_board are expected to hold the same cells as this board."""
+        rows, cols = self.board.shape
+        changed = np.zeros_like(self.active)
+        # phases of all tiles are summed into a single observation per generation
+        count_timer = metrics.accumulator('gol.count_neighbours')
+        rules_timer = metrics.accumulator('gol.apply_rules')
+
+        for tile_row, tile_col in np.argwhere(self.active):
+            row_start, col_start = tile_row * self.tile_size, tile_col * self.tile_size
+            row_stop = min(row_start + self.tile_size, rows)
+            col_stop = min(col_start + self.tile_size, cols)
+
+            with count_timer:
+                # tile with one cell halo (periodic boundary conditions)
+                block = self.board[np.ix_(np.arange(row_start - 1, row_stop + 1) % rows,
+                                          np.arange(col_start - 1, col_stop + 1) % cols)]
+                column_sums = block[:-2] + block[1:-1] + block[2:]
+                tile = block[1:-1, 1:-1]
+                neighbours = column_sums[:, :-2] + column_sums[:, 1:-1] + column_sums[:, 2:] - tile
+            with rules_timer:
+                next_tile = (neighbours == 3) | ((neighbours == 2) & (tile == 1))
+                if (next_tile != tile).any():
+                    changed[tile_row, tile_col] = True
+                new_board.board[row_start:row_stop, col_start:col_stop] = next_tile
+        count_timer.observe()
+        rules_timer.observe()
+
+        new_board.changed_tiles = changed
+        # changed tiles affect themselves and all neighbouring tiles in the next generation
+        rows_dilated = changed | np.roll(changed, 1, axis=0) | np.roll(changed, -1, axis=0)
+        new_board.active = rows_dilated | np.roll(rows_dilated, 1, axis=1) | np.roll(rows_dilated, -1, axis=1)
+
+    def update_board(self, new_board) -> bool:
+        """Updates board by coping temp board"""
+        if isinstance(new_board, TiledBoard):
+            np.copyto(self.board, new_board.board)
+            self.active = new_board.active.copy()
+            self.changed_tiles = None if new_board.changed_tiles is None else new_board.changed_tiles.copy()
+            return True
+        return False
@@ -1,7 +1,21 @@
 import unittest
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
 import numpy as np
-from Task3.game_elements import Cell, Board
-from Task3.game_of_life import GameEngine
+from Task3.game_elements import Cell, Board, ArrayBoard
+from Task3.game_of_life import GameEngine, main
+from Task3.bit_board import BitBoard
+from Task3.tiled_board import TiledBoard
+from Task3.hashlife import HashLife
+from Task3.parallel_board import (ParallelBoard, close_pools, compute_stripe, detach_boards, attached_boards,
+                                  stripe_buffers)
+from Task3.history import HistoryWriter, HistoryReader
+from Task3.patterns import load_initial_pose, load_live_cells, load_rle
+from Task3.cycle_detector import CycleDetector, CycleInfo, board_hash
+from Utils.metrics import metrics
 
 
 class TestCell(unittest.TestCase):
@@ -38,6 +52,482 @@ class TestGameEngine(unittest.TestCase):
         engine.compute_iter()
         self.assertEqual(repr(engine.temp_board).split('\n'), repr(correct_next_board).split('\n'))
 
+    def test_phase_metrics(self):
+        """Tests if every array engine records one observation of each phase per generation"""
+        board = np.random.default_rng(0).integers(0, 2, size=(8, 70), dtype=np.uint8)
+        engine = GameEngine('../Task3/config.json')
+        metrics.enabled = True
+        try:
+            for board_class in [Board, ArrayBoard, BitBoard, TiledBoard, ParallelBoard]:
+                boards = [board_class(board), board_class(board)]
+                engine.cells_board, engine.temp_board = boards
+                metrics.reset()
+                try:
+                    engine.compute_iter()
+                finally:
+                    for phase_board in boards:
+                        if hasattr(phase_board, 'close'):
+                            phase_board.close()
+                histograms = metrics.to_dict()['histograms']
+                for phase in ['gol.count_neighbours', 'gol.apply_rules']:
+                    self.assertEqual(histograms[phase]['count'], 1, (board_class.__name__, phase))
+        finally:
+            metrics.enabled = False
+            metrics.reset()
+            close_pools()
+
+    def test_numpy_engine(self):
+        """Tests if numpy engine gives the same generations as cells engine"""
+        board = np.random.default_rng(0).integers(0, 2, size=(7, 9))
+        cells_engine = GameEngine('../Task3/config.json')
+        cells_engine.cells_board = Board(board)
+        cells_engine.temp_board = Board(board)
+        numpy_engine = GameEngine('../Task3/config.json')
+        numpy_engine.cells_board = ArrayBoard(board)
+        numpy_engine.temp_board = ArrayBoard(board)
+
+        for _ in range(10):
+            cells_engine.compute_iter()
+            numpy_engine.compute_iter()
+            self.assertTrue(cells_engine.cells_board.update_board(cells_engine.temp_board))
+            self.assertTrue(numpy_engine.cells_board.update_board(numpy_engine.temp_board))
+            np.testing.assert_array_equal(numpy_engine.cells_board.states, cells_engine.cells_board.states)
+
+    def test_measure_iter_time(self):
+        """Tests if iteration times longer than a second don't wrap around"""
+        self.assertGreaterEqual(GameEngine.measure_iter_time(time.perf_counter() - 1.5), 1500000)
+
+    def test_swap_boards(self):
+        board = np.random.default_rng(0).integers(0, 2, size=(7, 9))
+        engine = GameEngine('../Task3/config.json')
+        engine.cells_board = Board(board)
+        engine.temp_board = Board(board)
+        expected = ArrayBoard(board)
+        expected_temp = ArrayBoard(board)
+
+        for _ in range(10):
+            current_board = engine.cells_board
+            engine.compute_iter()
+            engine.swap_boards()
+            self.assertIs(engine.temp_board, current_board)
+            expected.compute_next(expected_temp)
+            expected, expected_temp = expected_temp, expected
+            np.testing.assert_array_equal(engine.cells_board.states, expected.states)
+
+    def test_advance(self):
+        """Tests if hashlife engine jumps to the same generation as stepping one by one"""
+        board = np.random.default_rng(0).integers(0, 2, size=(8, 16))
+        engine = GameEngine('../Task3/config.json')
+        engine.cells_board = ArrayBoard(board)
+        engine.temp_board = ArrayBoard(board)
+        hashlife_engine = GameEngine('../Task3/config.json')
+        hashlife_engine.engine = 'hashlife'
+        hashlife_engine.cells_board = ArrayBoard(board)
+
+        for generations in [1, 5, 37]:
+            engine.advance(generations)
+            hashlife_engine.advance(generations)
+            np.testing.assert_array_equal(hashlife_engine.cells_board.states, engine.cells_board.states)
+
+    def test_advance_plane_mode(self):
+        """Tests if hashlife's plane doesn't depend on splitting generations and is reloaded after edits"""
+        board = np.zeros((8, 8), dtype=np.uint8)
+        board[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        engines = []
+        for _ in range(2):
+            engine = GameEngine('../Task3/config.json')
+            engine.engine = 'hashlife'
+            engine.config['hashlife_mode'] = 'plane'
+            engine.cells_board = ArrayBoard(board)
+            engines.append(engine)
+        engines[0].advance(60)
+        for _ in range(60):
+            engines[1].advance(1)
+        np.testing.assert_array_equal(engines[0].cells_board.states, engines[1].cells_board.states)
+
+        # edited board is loaded instead of the universe
+        engines[0].cells_board.board[...] = board
+        engines[0].advance(4)
+        np.testing.assert_array_equal(engines[0].cells_board.states[2:5, 2:5], board[1:4, 1:4])
+
+        with tempfile.TemporaryDirectory() as config_dir:
+            config_path = os.path.join(config_dir, 'config.json')
+            with open('../Task3/config.json') as f:
+                config = json.load(f)
+            config['engine'] = 'hashlife'
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+            with self.assertRaises(Exception):
+                GameEngine(config_path)  # 5x6 torus
+
+    def test_run_batch(self):
+        """Tests if headless run saves periodic and final snapshots"""
+        engine = GameEngine('../Task3/config.json')
+        with tempfile.TemporaryDirectory() as output_dir:
+            main(['run', '--config', '../Task3/config.json', '--generations', '5', '--no-sleep',
+                  '--snapshot-every', '2', '--output-dir', output_dir])
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             ['generation_00000002.npy', 'generation_00000004.npy', 'generation_00000005.npy'])
+            engine.advance(5)
+            np.testing.assert_array_equal(np.load(os.path.join(output_dir, 'generation_00000005.npy')),
+                                          engine.cells_board.states)
+
+
+class TestCycleDetector(unittest.TestCase):
+    def engine(self, board: np.array, engine_name: str, max_period: int = 64) -> GameEngine:
+        engine = GameEngine('../Task3/config.json')
+        engine.engine = engine_name
+        board_class = {'numpy': ArrayBoard, 'bits': BitBoard, 'tiled': TiledBoard,
+                       'small tiles': lambda states: TiledBoard(states, tile_size=16)}[engine_name]
+        engine.cells_board = board_class(board)
+        engine.temp_board = board_class(board)
+        engine.cycle_detector = CycleDetector(max_period)
+        return engine
+
+    def test_detect_cycle(self):
+        """Tests if still lifes and extinction are reported at once and cycles one period after they repeat"""
+        blinker, block, single_cell = np.zeros((3, 6, 6), dtype=np.uint8)
+        blinker[2, 1:4] = 1
+        block[1:3, 1:3] = 1
+        single_cell[3, 3] = 1
+        with open('../Task3/config.json') as f:
+            glider = np.array(json.load(f)['initial_pose'])
+        for engine_name in ['numpy', 'bits', 'tiled']:
+            with self.subTest(engine=engine_name):
+                for board, max_period, generations, expected in [
+                        (blinker, 64, 4, CycleInfo('cycle', 2, 0)),
+                        (block, 64, 1, CycleInfo('still life', 1, 0)),
+                        (single_cell, 64, 1, CycleInfo('extinction', 1, 1)),
+                        (glider, 200, 240, CycleInfo('cycle', 120, 0))]:
+                    engine = self.engine(board, engine_name, max_period)
+                    self.assertEqual(engine.advance(1000, until_cycle=True), generations)
+                    self.assertEqual(engine.cycle, expected)
+
+                # glider's period on 5x6 torus is longer than default max_period
+                engine = self.engine(glider, engine_name)
+                self.assertEqual(engine.advance(300, until_cycle=True), 300)
+                self.assertIsNone(engine.cycle)
+
+    def test_incremental_hash(self):
+        """Tests if hash updated with changed words or tiles equals hash of the whole board"""
+        board = np.zeros((40, 150), dtype=np.uint8)
+        board[5:25, 60:130] = np.random.default_rng(0).integers(0, 2, size=(20, 70))
+        for engine_name in ['numpy', 'bits', 'tiled', 'small tiles']:
+            engine = self.engine(board, engine_name)
+            for _ in range(30):
+                engine.advance(1)
+                self.assertEqual(engine.cycle_detector.hash, board_hash(engine.cells_board), engine_name)
+                self.assertEqual(engine.cycle_detector.hash, board_hash(ArrayBoard(engine.cells_board.states)))
+
+    def test_hash_collision(self):
+        """Tests if boards with colliding hashes are not reported as cycles or extinction"""
+        boards = [ArrayBoard(states) for states in np.random.default_rng(0).integers(0, 2, size=(5, 6, 6))]
+        detector = CycleDetector()
+        detector.reset(boards[0])
+        hashes = [board_hash(board) for board in boards]
+        # update adds changes to the hash, so that board 1 gets hash of board 0, as if their hashes collided
+        detector.hash = hashes[1]
+        self.assertIsNone(detector.update(boards[1], boards[0], 1))
+        self.assertEqual(detector.hash, hashes[0])
+        self.assertIsNone(detector.candidate)
+
+        detector.reset(boards[0])
+        self.assertIsNone(detector.update(boards[1], boards[0], 1))
+        detector.hash = hashes[0] ^ hashes[1] ^ hashes[2]  # board 2 gets hash of board 0
+        self.assertIsNone(detector.update(boards[2], boards[1], 2))
+        self.assertIsNotNone(detector.candidate)
+        self.assertIsNone(detector.update(boards[3], boards[2], 3))
+        self.assertIsNone(detector.update(boards[4], boards[3], 4))  # board 4 is not board 2
+
+        detector.reset(boards[0])
+        detector.empty_hash = board_hash(boards[1])
+        self.assertIsNone(detector.update(boards[1], boards[0], 1))
+
+    def test_run_batch(self):
+        """Tests if headless run stops at found cycle unless asked to keep running"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            main(['run', '--config', '../Task3/config.json', '--generations', '500', '--no-sleep',
+                  '--output-dir', output_dir, '--max-period', '200'])
+            self.assertEqual(os.listdir(output_dir), ['generation_00000240.npy'])
+        with tempfile.TemporaryDirectory() as output_dir:
+            main(['run', '--config', '../Task3/config.json', '--generations', '150', '--no-sleep',
+                  '--output-dir', output_dir, '--max-period', '200', '--keep-running'])
+            self.assertEqual(os.listdir(output_dir), ['generation_00000150.npy'])
+
+
+class TestHashLife(unittest.TestCase):
+    def test_plane_mode(self):
+        """Tests if glider moves on infinite plane the same way as on the torus far from its edges"""
+        board = np.zeros((20, 20), dtype=np.uint8)
+        board[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        universe = HashLife(board, mode='plane')
+        universe.advance(40)
+        self.assertEqual(universe.generation, 40)
+        np.testing.assert_array_equal(universe.states[11:14, 11:14], board[1:4, 1:4])
+        self.assertEqual(universe.states.sum(), 5)
+
+        universe.advance(100)  # glider leaves the board's window
+        self.assertEqual(universe.states.sum(), 0)
+        self.assertEqual(universe.root.population, 5)
+
+    def test_torus_mode(self):
+        with self.assertRaises(Exception):
+            HashLife(np.zeros((5, 8)))
+
+        board = np.zeros((8, 8), dtype=np.uint8)
+        board[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        universe = HashLife(board, max_cache_size=100)
+        universe.advance(10 ** 6)  # glider returns to the same place every 32 generations
+        np.testing.assert_array_equal(universe.states, board)
+
+
+class TestBitBoard(unittest.TestCase):
+    def test_conversions(self):
+        board = np.random.default_rng(0).integers(0, 2, size=(3, 70))
+        bit_board = BitBoard.from_initial_pose(board.tolist())
+        self.assertEqual(bit_board.board.shape, (3, 2))
+        self.assertEqual(bit_board.population, board.sum())
+        self.assertEqual(bit_board.to_initial_pose(), board.tolist())
+        self.assertEqual(repr(BitBoard.from_board(bit_board.to_board())), repr(ArrayBoard(board)))
+
+    def test_blocks_and_live_cells(self):
+        """Tests packing and counting in blocks of rows and building board from alive cells"""
+        board = np.random.default_rng(0).integers(0, 2, size=(9, 150), dtype=np.uint8)
+        with patch('Task3.bit_board.BLOCK_WORDS', 4):
+            bit_board = BitBoard(board)
+            np.testing.assert_array_equal(bit_board.states, board)
+            self.assertEqual(bit_board.population, board.sum())
+        rows, cols = np.nonzero(board)
+        np.testing.assert_array_equal(BitBoard.from_live_cells(board.shape, rows, cols).board, bit_board.board)
+
+    def test_compute_next(self):
+        """Tests if bit board gives the same generations as numpy board, including words' boundaries"""
+        rng = np.random.default_rng(0)
+        for shape in [(5, 5), (4, 64), (6, 70), (3, 130)]:
+            board = rng.integers(0, 2, size=shape)
+            array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+            bit_board, bit_temp = BitBoard(board), BitBoard(board)
+            for _ in range(10):
+                array_board.compute_next(array_temp)
+                bit_board.compute_next(bit_temp)
+                self.assertTrue(array_board.update_board(array_temp))
+                self.assertTrue(bit_board.update_board(bit_temp))
+                np.testing.assert_array_equal(bit_board.states, array_board.states)
+
+
+class TestTiledBoard(unittest.TestCase):
+    def test_compute_next(self):
+        """Tests if tiled board gives the same generations as numpy board"""
+        board = np.zeros((20, 27), dtype=np.uint8)
+        board[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]  # glider crossing tiles and board's edges
+        board[10:12, 20:22] = 1  # block
+        array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+        tiled_board, tiled_temp = TiledBoard(board, tile_size=8), TiledBoard(board, tile_size=8)
+        for _ in range(100):
+            array_board.compute_next(array_temp)
+            tiled_board.compute_next(tiled_temp)
+            self.assertTrue(array_board.update_board(array_temp))
+            self.assertTrue(tiled_board.update_board(tiled_temp))
+            np.testing.assert_array_equal(tiled_board.states, array_board.states)
+
+    def test_swapped_boards(self):
+        """Tests if skipped tiles stay correct when boards are swapped instead of copied"""
+        board = np.zeros((20, 27), dtype=np.uint8)
+        board[1:4, 1:4] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        board[10, 20:23] = 1  # blinker
+        array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+        tiled_board, tiled_temp = TiledBoard(board, tile_size=8), TiledBoard(board, tile_size=8)
+        for _ in range(100):
+            array_board.compute_next(array_temp)
+            tiled_board.compute_next(tiled_temp)
+            array_board, array_temp = array_temp, array_board
+            tiled_board, tiled_temp = tiled_temp, tiled_board
+            np.testing.assert_array_equal(tiled_board.states, array_board.states)
+
+    def test_stable_tiles_skipped(self):
+        board = np.zeros((32, 32), dtype=np.uint8)
+        board[10:12, 10:12] = 1  # block
+        tiled_board, tiled_temp = TiledBoard(board, tile_size=8), TiledBoard(board, tile_size=8)
+        tiled_board.compute_next(tiled_temp)
+        self.assertTrue(tiled_board.update_board(tiled_temp))
+        self.assertFalse(tiled_board.active.any())
+
+
+class TestParallelBoard(unittest.TestCase):
+    def tearDown(self):
+        close_pools()
+
+    def test_compute_next(self):
+        """Tests if parallel board is identical to numpy board"""
+        board = np.random.default_rng(0).integers(0, 2, size=(11, 13))
+        array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+        parallel_board, parallel_temp = ParallelBoard(board, workers=3), ParallelBoard(board, workers=3)
+        try:
+            for _ in range(10):
+                array_board.compute_next(array_temp)
+                parallel_board.compute_next(parallel_temp)
+                self.assertTrue(array_board.update_board(array_temp))
+                self.assertTrue(parallel_board.update_board(parallel_temp))
+                np.testing.assert_array_equal(parallel_board.states, array_board.states)
+        finally:
+            parallel_board.close()
+            parallel_temp.close()
+
+    def test_compute_stripe(self):
+        """Tests stripes of one and many rows, wrapping around the board, in the calling process"""
+        board = np.random.default_rng(0).integers(0, 2, size=(7, 9))
+        array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+        array_board.compute_next(array_temp)
+        boards = [ParallelBoard(board, workers=1), ParallelBoard(np.zeros_like(board), workers=1)]
+        names = [parallel_board.shared_memory.name for parallel_board in boards]
+        try:
+            for start, stop in [(0, 1), (1, 4), (4, 7), (6, 7), (0, 7)]:
+                compute_stripe(names[0], names[1], board.shape, start, stop)
+            np.testing.assert_array_equal(boards[1].states, array_temp.states)
+            buffers = [buffer.ctypes.data for buffer in stripe_buffers]
+            compute_stripe(names[0], names[1], board.shape, 2, 5)
+            self.assertEqual([buffer.ctypes.data for buffer in stripe_buffers], buffers)
+        finally:
+            detach_boards(set())
+            for parallel_board in boards:
+                parallel_board.close()
+
+    def test_detach_boards(self):
+        """Tests if worker keeps shared memory attached only for boards of the last task"""
+        board = np.random.default_rng(0).integers(0, 2, size=(4, 5))
+        boards = [ParallelBoard(board, workers=1) for _ in range(3)]
+        names = [parallel_board.shared_memory.name for parallel_board in boards]
+        try:
+            compute_stripe(names[0], names[1], board.shape, 0, board.shape[0])
+            self.assertEqual(set(attached_boards), {names[0], names[1]})
+            compute_stripe(names[1], names[2], board.shape, 0, board.shape[0])
+            self.assertEqual(set(attached_boards), {names[1], names[2]})
+        finally:
+            detach_boards(set())
+            for parallel_board in boards:
+                parallel_board.close()
+
+    def test_run_batch(self):
+        """Tests if headless run of parallel engine reports throughput after releasing shared memory"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            config_path = os.path.join(output_dir, 'config.json')
+            with open('../Task3/config.json') as f:
+                config = json.load(f)
+            config['engine'] = 'parallel'
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+            main(['run', '--config', config_path, '--generations', '5', '--no-sleep', '--output-dir', output_dir])
+            engine = GameEngine('../Task3/config.json')
+            engine.advance(5)
+            np.testing.assert_array_equal(np.load(os.path.join(output_dir, 'generation_00000005.npy')),
+                                          engine.cells_board.states)
+
+
+class TestHistory(unittest.TestCase):
+    def test_write_read(self):
+        board = np.random.default_rng(0).integers(0, 2, size=(30, 45))
+        array_board, array_temp = ArrayBoard(board), ArrayBoard(board)
+        generations = []
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, 'history.golh')
+            with HistoryWriter(path, board.shape, keyframe_interval=10) as writer:
+                for generation in range(25):
+                    generations.append(array_board.states.copy())
+                    writer.write(generation, array_board.states)
+                    array_board.compute_next(array_temp)
+                    array_board, array_temp = array_temp, array_board
+
+            with HistoryReader(path) as reader:
+                self.assertEqual(len(reader), 25)
+                for generation in [0, 9, 10, 17, 24]:
+                    np.testing.assert_array_equal(reader.read(generation), generations[generation])
+                with self.assertRaises(Exception):
+                    reader.read(25)
+
+            # file with the last frame written partially, e.g. when writer was not closed
+            with open(path, 'rb') as f:
+                data = f.read()
+            index_offset = int(np.frombuffer(data[-20:-12], dtype='<u8')[0])
+            with open(path, 'wb') as f:
+                f.write(data[:index_offset - 5])
+            with HistoryReader(path) as reader:
+                self.assertEqual(len(reader), 24)
+                np.testing.assert_array_equal(reader.read(23), generations[23])
+                stored_generations = reader.generations
+            self.assertEqual(stored_generations[-1], 23)  # usable after closing the reader
+
+    def test_write_error(self):
+        """Tests if failure of the writing thread is raised by write and close instead of blocking"""
+        board = np.zeros((8, 8), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, 'history.golh')
+            with self.assertRaises(Exception):
+                HistoryWriter(path, board.shape, keyframe_interval=0)
+
+            writer = HistoryWriter(path, board.shape, queue_size=2)
+            writer.file.close()  # writing thread fails on the first frame
+            with self.assertRaises(ValueError):
+                for generation in range(10):
+                    writer.write(generation, board)
+            with self.assertRaises(ValueError):
+                writer.close()
+
+
+class TestPatterns(unittest.TestCase):
+    glider = np.array([[0, 1, 0],
+                       [0, 0, 1],
+                       [1, 1, 1]])
+
+    def test_load_initial_pose(self):
+        board = load_initial_pose({'rows': 4, 'cols': 5, 'live_cells': [[0, 1], [1, 2], [2, 0], [2, 1], [2, 2]]})
+        np.testing.assert_array_equal(board[:3, :3], self.glider)
+        self.assertEqual(board.shape, (4, 5))
+        self.assertEqual(board.sum(), 5)
+
+        with tempfile.TemporaryDirectory() as config_dir:
+            with open(os.path.join(config_dir, 'glider.rle'), 'w') as f:
+                f.write('#N Glider\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n')
+            with open(os.path.join(config_dir, 'glider.lif'), 'w') as f:
+                f.write('#Life 1.06\n0 -1\n1 0\n-1 1\n0 1\n1 1\n')
+
+            np.testing.assert_array_equal(load_initial_pose({'pattern': 'glider.rle'}, config_dir), self.glider)
+            np.testing.assert_array_equal(load_initial_pose({'pattern': 'glider.lif'}, config_dir), self.glider)
+            for pattern in ['glider.rle', 'glider.lif']:
+                board = load_initial_pose({'pattern': pattern, 'rows': 10, 'cols': 8, 'row': 2, 'col': 4}, config_dir)
+                self.assertEqual(board.shape, (10, 8))
+                np.testing.assert_array_equal(board[2:5, 4:7], self.glider)
+                self.assertEqual(board.sum(), 5)
+                with self.assertRaises(ValueError):
+                    load_initial_pose({'pattern': pattern, 'rows': 10, 'cols': 8, 'row': 8, 'col': 4}, config_dir)
+            with self.assertRaises(ValueError):
+                load_initial_pose({'rows': 2, 'cols': 5, 'live_cells': [[2, 0]]})
+
+            rle = 'x = 12, y = 2\n3o2b4o$b10o!\n'
+            with open(os.path.join(config_dir, 'runs.rle'), 'w') as f:
+                f.write(rle)
+            for initial_pose in [[[0, 1, 1], [1, 0, 0]], {'pattern': 'runs.rle', 'rows': 5, 'cols': 16, 'row': 1},
+                                 {'pattern': 'glider.lif', 'rows': 10, 'cols': 8, 'row': 2, 'col': 4},
+                                 {'rows': 4, 'cols': 5, 'live_cells': [[0, 1], [3, 4]]}]:
+                shape, rows, cols = load_live_cells(initial_pose, config_dir)
+                board = load_initial_pose(initial_pose, config_dir)
+                self.assertEqual(shape, board.shape)
+                self.assertEqual(sorted(zip(rows.tolist(), cols.tolist())), list(zip(*np.nonzero(board))))
+
+            config_path = os.path.join(config_dir, 'config.json')
+            with open(config_path, 'w') as f:
+                json.dump({'initial_pose': {'pattern': 'glider.rle', 'rows': 6, 'cols': 6}, 'refresh_rate': 0,
+                           'engine': 'numpy'}, f)
+            engine = GameEngine(config_path)
+            np.testing.assert_array_equal(engine.cells_board.states[:3, :3], self.glider)
+
+            with open(config_path, 'w') as f:
+                json.dump({'initial_pose': {'pattern': 'runs.rle', 'rows': 5, 'cols': 70, 'row': 1, 'col': 56},
+                           'refresh_rate': 0, 'engine': 'bits'}, f)
+            engine = GameEngine(config_path)
+            self.assertIsInstance(engine.cells_board, BitBoard)
+            np.testing.assert_array_equal(engine.cells_board.states, load_rle(os.path.join(config_dir, 'runs.rle'),
+                                                                              (5, 70), (1, 56)))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestImports(unittest.TestCase):
+    def test_core_modules_without_gui(self):
+        """Tests if engines can be imported without loading Qt and PrettyTable"""
+        for module in ['Task1.traffic_lights', 'Task1.simulation', 'Task2.square_root', 'Task2.stream',
+                       'Task3.game_of_life', 'Utils.metrics']:
+            code = f'import sys, {module}; print([name for name in ["PyQt5", "prettytable"] if name in sys.modules])'
+            output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True,
+                                    check=True).stdout
+            self.assertEqual(output.strip(), '[]', module)
+
+
+if __name__ == '__main__':
+    unittest.main()
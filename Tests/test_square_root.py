@@ -1,5 +1,13 @@
 import unittest
-from Task2 import square_root
+import csv
+import json
+import os
+import tempfile
+import math
+from decimal import Decimal, localcontext
+import numpy as np
+import io
+from Task2 import square_root, sweep, precise_square_root, stream
 
 
 class TestSquareRoot(unittest.TestCase):
@@ -8,12 +16,143 @@ class TestSquareRoot(unittest.TestCase):
         methods = ['newton', 'bisection']
         self.assertTrue(square_root.validate_user_input(data))
 
-        # checks if error < epsilon and elapsed iterations < max iterations
+        # checks if error <= epsilon and elapsed iterations < max iterations
         for method in methods:
             error, _, iter_idx = square_root.calculate_square_root(data, method)
             self.assertLessEqual(error, data['epsilon'])
             self.assertLessEqual(iter_idx, data['max iterations'])
 
+    def test_benchmark_square_root(self):
+        data = {'n': '2', 'epsilon': '0.001', 'max iterations': '100', 'start point': '2', 'search range': '0,3'}
+        self.assertTrue(square_root.validate_user_input(data))
+        for method in ['newton', 'bisection']:
+            result = square_root.benchmark_square_root(data, method, repeats=20, warmup=2)
+            self.assertLessEqual(result['min'], result['median'])
+            self.assertLessEqual(result['median'], result['p95'])
+            self.assertLessEqual(result['error'], data['epsilon'])
+
+            trace = square_root.IterationTrace(capacity=3)
+            error, iter_idx, root = square_root.solve_square_root(data['n'], data['epsilon'], data['max iterations'],
+                                                                  data['start point'], data['search range'],
+                                                                  method, trace)
+            self.assertEqual(result['iterations'], iter_idx)
+            self.assertEqual(trace.size, min(3, iter_idx))
+            if iter_idx <= 3:
+                self.assertEqual(list(trace)[-1], (root, error))
+
+    def test_calculate_square_root_batch(self):
+        """Tests if batch results are the same as calculated one by one"""
+        inputs = [('2', '0.001', '100', '2', '0,3'), ('9', '1e-9', '100', '1', '0,4'),
+                  ('0.25', '1e-6', '3', '0.1', '0,1'), ('1000000', '1e-6', '100', '3', '0,2000')]
+        params = []
+        for n, eps, max_iter, x1, search_range in inputs:
+            data = {'n': n, 'epsilon': eps, 'max iterations': max_iter, 'start point': x1,
+                    'search range': search_range}
+            square_root.validate_user_input(data)
+            params.append(data)
+
+        for method in ['newton', 'bisection']:
+            roots, errors, iterations = square_root.calculate_square_root_batch(
+                n=np.array([data['n'] for data in params]),
+                epsilon=np.array([data['epsilon'] for data in params]),
+                max_iters=np.array([data['max iterations'] for data in params]),
+                start_points=np.array([data['start point'] for data in params]),
+                search_ranges=np.array([data['search range'] for data in params]),
+                method=method)
+            for idx, data in enumerate(params):
+                error, _, iter_idx = square_root.calculate_square_root(data, method)
+                self.assertEqual(errors[idx], error)
+                self.assertEqual(iterations[idx], iter_idx)
+
+    def test_initial_guess(self):
+        """Tests if Newton method converges within 3 iterations from automatic start point"""
+        n = np.logspace(-300, 300, 1201)
+        self.assertLess(np.max(np.abs(square_root.initial_guess(n) / np.sqrt(n) - 1)), 3e-3)
+        _, errors, iterations = square_root.calculate_square_root_batch(n, 1e-14 * np.sqrt(n), 100)
+        self.assertTrue((errors < 1e-14 * np.sqrt(n)).all())
+        self.assertLessEqual(iterations.max(), 3)
+
+        data = {'n': '2', 'epsilon': '0.001', 'max iterations': '100', 'start point': 'auto', 'search range': '0,3'}
+        self.assertTrue(square_root.validate_user_input(data))
+        self.assertAlmostEqual(data['start point'], np.sqrt(2), places=2)
+        self.assertEqual(square_root.initial_guess(0.0), 0.0)
+
+    def test_precise_square_root(self):
+        for n in [0, 1, 2, 15, 16, 17, 2 ** 64 - 1, 10 ** 1000 + 7, (10 ** 300 + 3) ** 2]:
+            self.assertEqual(precise_square_root.precise_square_root(n), math.isqrt(n))
+        self.assertEqual(precise_square_root.precise_square_root('99'), 9)
+        with self.assertRaises(Exception):
+            precise_square_root.precise_square_root(-4)
+
+        for x, digits in [('2', 1000), ('1e-701', 50), ('123.456e400', 200), ('0.25', 5)]:
+            with localcontext() as context:
+                context.prec = digits
+                expected = Decimal(x).sqrt()
+            self.assertEqual(precise_square_root.precise_square_root(Decimal(x), digits), expected)
+
+    def test_run_sweep(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            grid_path = os.path.join(output_dir, 'grid.json')
+            output_path = os.path.join(output_dir, 'sweep.csv')
+            with open(grid_path, 'w') as f:
+                json.dump({'n': {'start': 1, 'stop': 100, 'num': 3, 'scale': 'log'}, 'epsilon': [1e-3, 1e-9],
+                           'max iterations': [100], 'start point': [1, 5], 'search range': [[0, 20], [50, 60]]}, f)
+
+            cases_count = sweep.run_sweep(sweep.load_grid(grid_path), output_path, workers=2, chunk_size=5)
+            self.assertEqual(cases_count, 3 * 2 * 2 * 2 * 2)
+            with open(output_path) as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), cases_count)
+        for row in rows:
+            if float(row['search range start']) == 50:
+                self.assertIn('does not exist', row['status'])
+            else:
+                self.assertEqual(row['status'], 'converged')
+                self.assertLess(float(row['error']), float(row['epsilon']))
+
+    def test_converged_at_epsilon(self):
+        """Tests if error equal to epsilon ends iterations and is reported as converged by every mode"""
+        # Newton step from 4 gives 2.5, error 0.5
+        iterations, error, _, status = sweep.run_case(4, 0.5, 100, 4, [0, 4], 'newton')[-4:]
+        self.assertEqual((iterations, error, status), (1, 0.5, 'converged'))
+        _, errors, iterations = square_root.calculate_square_root_batch(np.array([4.0]), 0.5, 100, np.array([4.0]))
+        self.assertEqual((errors[0], iterations[0]), (0.5, 1))
+        rows = stream.solve_chunk(np.array([[4, 0.5, 100, 4, 0, 4]], dtype=float), ['newton'])
+        self.assertEqual(rows[0][-3:], (0.5, 1, 'converged'))
+
+    def test_stream_square_roots(self):
+        csv_lines = ['n,epsilon,max iterations,start point,search range start,search range end\n',
+                     '2,0.001,100,2,0,3\n', '16,1e-9,100,auto,0,5\n', '\n', '-2,0.001,100,2,0,3\n',
+                     '2,0,100,2,0,3\n', '2,0.001,100,c,0,3\n', '3,0.001,100,2,2,4\n']
+        jsonl_lines = [json.dumps({'n': 2, 'epsilon': 0.001, 'max iterations': 100, 'start point': 'auto',
+                                   'search range': [0, 3]}) + '\n', '{"n": 2}\n',
+                       json.dumps({'n': '9', 'epsilon': '0.001', 'max iterations': '100', 'start point': '2',
+                                   'search range': '0,4'}) + '\n']
+        output = io.StringIO()
+        self.assertEqual(stream.stream_square_roots(csv_lines, output, chunk_size=2), 6)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 2 * 6)
+        statuses = [row['status'] for row in rows if row['method'] == 'bisection']
+        self.assertEqual(statuses[:2], ['converged', 'converged'])
+        self.assertIn('negative', statuses[2])
+        self.assertIn('Epsilon', statuses[3])
+        self.assertIn('int or float', statuses[4])
+        self.assertIn('does not exist', statuses[5])
+        self.assertEqual([row['line'] for row in rows if row['method'] == 'bisection'], ['2', '3', '5', '6', '7', '8'])
+        for row in rows[:2]:
+            self.assertLess(float(row['error']), float(row['epsilon']))
+
+        output = io.StringIO()
+        self.assertEqual(stream.stream_square_roots(jsonl_lines, output, 'jsonl', ['newton']), 3)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual([row['status'] for row in rows],
+                         ['converged', 'Parameters should be of type int or float', 'converged'])
+        self.assertAlmostEqual(float(rows[0]['root']), np.sqrt(2), places=3)
+        self.assertAlmostEqual(float(rows[0]['start point']), np.sqrt(2), places=2)
+        self.assertEqual(rows[2]['search range end'], '4.0')
+        self.assertAlmostEqual(float(rows[2]['root']), 3, places=3)
+
     def test_validate_search_range(self):
         self.assertTrue(square_root.validate_search_range(2, [0, 4]))
         self.assertTrue(square_root.validate_search_range(8, [0, 4]))
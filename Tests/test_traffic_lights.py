@@ -1,5 +1,9 @@
 import unittest
-from Task1.traffic_lights import TrafficLight
+from Task1.traffic_lights import TrafficLight, StateLog, compile_states
+from Task1.clock import VirtualClock
+from Task1.simulation import simulate
+from Task1.scheduler import TrafficLightScheduler, create_lights, phase_state
+import threading
 import time
 
 
@@ -23,25 +27,133 @@ class TestTrafficLight(unittest.TestCase):
         self.assertEqual(traffic_lights.car_light, 'red')
         self.assertEqual(traffic_lights.pedestrian_light, 'green')
 
+    def test_state_log(self):
+        """Tests if only the last transitions are kept and formatted on read"""
+        log = StateLog(capacity=3)
+        for timestamp, state in enumerate([1, 2, 3, 1, 2]):
+            log.record(timestamp, state)
+        self.assertEqual(len(log), 3)
+        self.assertEqual(list(log), [(2, 3), (3, 1), (4, 2)])
+        self.assertEqual(log.lines()[0], '2 seconds | State 3 -> Pedestrian light: red | Car light: yellow')
+
+        traffic_lights = TrafficLight(log_size=2)
+        traffic_lights.change_lights(2)
+        self.assertEqual([state for _, state in traffic_lights.log], [2])
+
+        with self.assertRaises(Exception):
+            compile_states({1: {'pedestrian_light': 'red', 'car_light': 'red', 'next_state': 2, 'delay': 1}})
+
     def test_change_state(self):
-        """Tests if state is being changed correctly including delay time"""
+        """Tests if state is being changed correctly including delay time, in virtual time"""
+        clock = VirtualClock()
+        traffic_lights = TrafficLight(clock=clock)
+        start_time = time.time()
+        for dst_state, delay in [(2, 10), (3, 20), (1, 2)]:
+            virtual_start_time = clock.now()
+            traffic_lights.change_state(dst_state=dst_state, delay=delay)
+            self.assertEqual(traffic_lights.state, dst_state)
+            self.assertEqual(clock.now() - virtual_start_time, delay)
+        self.assertEqual(traffic_lights.run_time, 32)
+        self.assertLess(time.time() - start_time, 0.1)
+
+    def test_change_state_cpu_time(self):
+        """Tests if waiting for the next state on the real clock blocks instead of spinning"""
         traffic_lights = TrafficLight()
+        for state, dst_state in [(1, 2), (2, 3)]:
+            traffic_lights.change_lights(state)
+            start_time, start_cpu_time = time.perf_counter(), time.process_time()
+            traffic_lights.change_state(dst_state=dst_state, delay=0.3)
+            wall_time, cpu_time = time.perf_counter() - start_time, time.process_time() - start_cpu_time
+            self.assertEqual(traffic_lights.state, dst_state)
+            self.assertGreaterEqual(wall_time, 0.3)
+            self.assertLess(cpu_time, 0.1 * wall_time)
 
-        start_time = time.time()
-        traffic_lights.change_state(dst_state=2, delay=10)
-        exec_time = time.time() - start_time
-        self.assertEqual(traffic_lights.state, 2)
-        self.assertAlmostEqual(exec_time, 10, places=2)
+    def test_stop(self):
+        """Tests if stop ends run waiting in any state"""
+        for state in [1, 2]:
+            traffic_lights = TrafficLight()
+            traffic_lights.change_lights(state)
+            logs = []
+            thread = threading.Thread(target=traffic_lights.run, args=({'update_logs_func': logs.append},))
+            thread.start()
+            time.sleep(0.1)
+            traffic_lights.stop()
+            thread.join(timeout=1)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual((traffic_lights.state, logs), (state, []))
+            self.assertFalse(traffic_lights.pedestrian_btn)
+
+        # stopped light runs again, pedestrian button still ends state 2
+        thread = threading.Thread(target=traffic_lights.run, args=({'update_logs_func': logs.append},))
+        thread.start()
+        traffic_lights.pedestrian_btn = True
+        time.sleep(0.1)
+        traffic_lights.stop()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(traffic_lights.state, 3)
+        self.assertEqual([state for _, state in logs], [3])
+
+    def test_pedestrian_btn(self):
+        """Tests if pressing pedestrian button in state 2 changes state immediately"""
+        traffic_lights = TrafficLight()
+        traffic_lights.change_lights(2)
+        threading.Timer(0.1, lambda: setattr(traffic_lights, 'pedestrian_btn', True)).start()
 
         start_time = time.time()
         traffic_lights.change_state(dst_state=3, delay=20)
-        exec_time = time.time() - start_time
+        self.assertLess(time.time() - start_time, 0.5)
         self.assertEqual(traffic_lights.state, 3)
-        self.assertAlmostEqual(exec_time, 20, places=2)
+        self.assertFalse(traffic_lights.pedestrian_btn)
 
-        start_time = time.time()
-        traffic_lights.change_state(dst_state=1, delay=2)
-        exec_time = time.time() - start_time
-        self.assertEqual(traffic_lights.state, 1)
-        self.assertAlmostEqual(exec_time, 2, places=2)
 
+class TestTrafficLightScheduler(unittest.TestCase):
+    def test_phase_state(self):
+        self.assertEqual(phase_state(0), (1, 10))
+        self.assertEqual(phase_state(15), (2, 15))
+        self.assertEqual(phase_state(31), (3, 1))
+        self.assertEqual(phase_state(32 + 4), (1, 6))
+
+    def test_run(self):
+        """Tests if lights change states at their deadlines and pedestrian requests end state 2"""
+        lights = create_lights(3)
+        scheduler = TrafficLightScheduler(lights, offsets=[10 - 0.1, 31.9, 15])
+        transitions = []
+        scheduler.on_transition = lambda idx: transitions.append((idx, lights[idx].state))
+        scheduler.start()
+        self.assertEqual([light.state for light in lights], [1, 3, 2])
+
+        threading.Timer(0.2, scheduler.request_crossing, args=(2,)).start()
+        scheduler.run(duration=0.4)
+        self.assertEqual(sorted(transitions), [(0, 2), (1, 1), (2, 3)])
+        self.assertLess(scheduler.max_lateness, 0.05)
+
+        # request in state 1 is remembered until the light gets to state 2
+        scheduler.request_crossing(1)
+        scheduler.run(duration=0.1)
+        self.assertTrue(lights[1].pedestrian_btn)
+
+
+class TestSimulation(unittest.TestCase):
+    def test_pedestrian_btn_virtual_clock(self):
+        """Tests if pedestrian button pressed in state 2 ends it at the time of pressing, in virtual time"""
+        clock = VirtualClock(start=32)
+        traffic_lights = TrafficLight(clock=clock)
+        traffic_lights.change_lights(2)
+        clock.call_at(clock.now() + 5, setattr, traffic_lights, 'pedestrian_btn', True)
+        traffic_lights.change_state(dst_state=3, delay=20)
+        self.assertEqual((traffic_lights.state, clock.now()), (3, 37))
+        self.assertFalse(traffic_lights.pedestrian_btn)
+
+    def test_simulate(self):
+        """Tests transitions log of a day with scripted pedestrians"""
+        log = simulate(2, 24 * 3600, offsets=[0, 12], pedestrian_arrivals=[(5, 0), (15, 1), (30, 0)])
+        transitions = list(log)
+        self.assertEqual(transitions[:2], [(0, 0, 1), (0, 1, 2)])
+        # light 0 pressed in state 1 gets through state 2 at once, light 1 is in state 2 when pressed
+        self.assertEqual(transitions[2:6], [(10, 0, 2), (10, 0, 3), (12, 0, 1), (15, 1, 3)])
+        # light 0 pressed in the middle of state 2
+        self.assertEqual([transition for transition in transitions[7:10] if transition[1] == 0],
+                         [(22, 0, 2), (30, 0, 3)])
+        self.assertGreater(len(log), 2 * (24 * 3600 // 32) * 3)
+        self.assertLessEqual(log.times[-1], 24 * 3600)
@@ -0,0 +1,130 @@
+import contextlib
+import io
+import os
+import threading
+import time
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from Utils.utils import WorkerPool, UpdateChannel, LogView, print_exception
+from Utils.metrics import Metrics, NULL_TIMER
+
+app = QApplication.instance() or QApplication([])
+
+
+def process_events(duration: float) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(int(duration * 1000), loop.quit)
+    loop.exec()
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_submit_and_cancel(self):
+        pool = WorkerPool(max_workers=1)
+        self.assertEqual(pool.submit(sum, [1, 2, 3]).result(timeout=1), 6)
+
+        started_event, stop_event = threading.Event(), threading.Event()
+
+        def wait_for_stop():
+            started_event.set()
+            return stop_event.wait()
+
+        running_task = pool.submit(wait_for_stop, on_cancel=stop_event.set)
+        queued_task = pool.submit(sum, [1])
+        started_event.wait(timeout=1)
+        queued_task.cancel()
+        running_task.cancel()
+        self.assertTrue(running_task.result(timeout=1))
+        self.assertTrue(queued_task.future.cancelled())
+        pool.shutdown()
+
+    def test_print_exception(self):
+        """Tests if traceback of failed task is printed"""
+        pool = WorkerPool(max_workers=1)
+        future = pool.executor.submit(int, 'not a number')
+        future.exception(timeout=1)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            print_exception(future)
+        self.assertIn('ValueError', stderr.getvalue())
+        self.assertIn('Traceback', stderr.getvalue())
+        pool.shutdown()
+
+
+class TestUpdateChannel(unittest.TestCase):
+    def test_coalescing(self):
+        """Tests if updates published from another thread are delivered in a few batches"""
+        channel = UpdateChannel(max_rate=10)
+        batches = []
+        channel.updates_ready.connect(batches.append)
+
+        def publish():
+            for idx in range(1000):
+                channel.publish(idx)
+                time.sleep(0.0002)
+
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        while publisher.is_alive():
+            process_events(0.05)
+        process_events(0.2)
+        self.assertEqual([update for batch in batches for update in batch], list(range(1000)))
+        self.assertLess(len(batches), 10)
+
+        latest_channel = UpdateChannel(max_rate=10, latest_only=True)
+        latest_channel.updates_ready.connect(batches.append)
+        for idx in range(5):
+            latest_channel.publish(idx)
+        process_events(0.1)
+        self.assertEqual(batches[-1], [4])
+
+    def test_log_view(self):
+        log_view = LogView(max_lines=10)
+        for idx in range(5):
+            log_view.append_lines([f'line {idx}.{line}' for line in range(5)])
+        self.assertEqual(log_view.blockCount(), 10)
+        self.assertEqual(log_view.toPlainText().splitlines()[-1], 'line 4.4')
+
+
+class TestMetrics(unittest.TestCase):
+    def test_metrics(self):
+        metrics = Metrics()
+        self.assertIs(metrics.timer('phase'), NULL_TIMER)
+        metrics.count('events')
+        self.assertEqual(metrics.to_dict(), {'counters': {}, 'histograms': {}})
+
+        metrics.enabled = True
+        for _ in range(3):
+            with metrics.timer('phase'):
+                pass
+        metrics.observe('phase', 20.0)
+        metrics.count('events', 5)
+        histogram = metrics.to_dict()['histograms']['phase']
+        self.assertEqual((histogram['count'], histogram['max'], histogram['buckets']['+Inf']), (4, 20.0, 1))
+        self.assertEqual(metrics.to_dict()['counters'], {'events': 5})
+
+        prometheus = metrics.to_prometheus().splitlines()
+        self.assertIn('events_total 5', prometheus)
+        self.assertIn('phase_seconds_bucket{le="+Inf"} 4', prometheus)
+        self.assertIn('phase_seconds_count 4', prometheus)
+
+    def test_accumulator(self):
+        metrics = Metrics()
+        self.assertIs(metrics.accumulator('phase'), NULL_TIMER)
+        metrics.accumulator('phase').observe()
+        metrics.enabled = True
+        accumulator = metrics.accumulator('phase')
+        for _ in range(3):
+            with accumulator:
+                time.sleep(0.01)
+        accumulator.observe()
+        histogram = metrics.to_dict()['histograms']['phase']
+        self.assertEqual(histogram['count'], 1)
+        self.assertGreaterEqual(histogram['sum'], 0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import json
+import re
+import time
+from bisect import bisect_left
+
+# upper bounds of histogram buckets in seconds, 1-2.5-5 steps from 1 μs to 10 s
+TIME_BUCKETS = tuple(float(f'{base}e{exponent}') for exponent in range(-6, 1) for base in (1, 2.5, 5)) + (10.0,)
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, like Prometheus histograms"""
+
+    def __init__(self, buckets: tuple = TIME_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one counts values above all buckets
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'sum': self.sum, 'min': self.min if self.count else None,
+                'max': self.max if self.count else None, 'mean': self.sum / self.count if self.count else None,
+                'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self.counts))}
+
+
+class Timer:
+    """Context manager adding elapsed time to histogram"""
+    __slots__ = ['histogram', 'start_time']
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start_time)
+
+
+class Accumulator:
+    """Context manager summing elapsed time of many blocks, e.g. of all tiles of a generation,
+    observe adds the sum to histogram as a single value"""
+    __slots__ = ['histogram', 'start_time', 'total']
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.total = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total += time.perf_counter() - self.start_time
+
+    def observe(self) -> None:
+        self.histogram.observe(self.total)
+        self.total = 0.0
+
+
+class NullTimer:
+    """Timer and accumulator used while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def observe(self) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics:
+    """Named counters and timing histograms. While disabled, timer returns shared no-op timer
+    and count returns at once, so hooks cost a single call"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def timer(self, name: str):
+        """Returns context manager measuring time of its block in seconds"""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self.histogram(name))
+
+    def accumulator(self, name: str):
+        """Returns context manager summing time of its blocks in seconds until its observe is called"""
+        if not self.enabled:
+            return NULL_TIMER
+        return Accumulator(self.histogram(name))
+
+    def observe(self, name: str, value: float) -> None:
+        if self.enabled:
+            self.histogram(name).observe(value)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.histograms = {}
+
+    def to_dict(self) -> dict:
+        return {'counters': dict(self.counters),
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()}}
+
+    def to_prometheus(self) -> str:
+        """Returns metrics in Prometheus text exposition format"""
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            name = metric_name(name) + '_total'
+            lines += [f'# TYPE {name} counter', f'{name} {value}']
+        for name, histogram in sorted(self.histograms.items()):
+            name = metric_name(name) + '_seconds'
+            lines.append(f'# TYPE {name} histogram')
+            cumulative_count = 0
+            for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative_count += count
+                lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative_count}')
+            lines += [f'{name}_sum {histogram.sum}', f'{name}_count {histogram.count}']
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str) -> None:
+        """Writes metrics to file, in Prometheus format if its extension is .prom, otherwise as JSON"""
+        with open(path, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, indent=2)
+
+
+def metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+metrics = Metrics()  # registry shared by all engines, enabled by --metrics options
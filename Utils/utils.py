@@ -1,34 +1,126 @@
-from PyQt5.QtCore import QObject, pyqtSignal
-from PyQt5.QtCore import QThread
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, Future
 
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtWidgets import QPlainTextEdit
 
-class Worker(QObject):
-    def __init__(self, func, **kwargs):
+MAX_LOG_LINES = 1000
+
+
+class Task:
+    """Handle of a task submitted to WorkerPool"""
+
+    def __init__(self, future: Future, on_cancel=None):
+        self.future = future
+        self.on_cancel = on_cancel  # asks already running task to finish
+
+    def cancel(self) -> None:
+        if not self.future.cancel() and self.on_cancel is not None:
+            self.on_cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float = None):
+        return self.future.result(timeout)
+
+
+class WorkerPool:
+    """Persistent background threads for long-running tasks, so that GUIs don't create a thread per task"""
+
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='worker')
+        self.tasks = []
+
+    def submit(self, func, *args, on_cancel=None, **kwargs) -> Task:
+        """Runs func(*args, **kwargs) in the pool. on_cancel is called if task is cancelled while running"""
+        future = self.executor.submit(func, *args, **kwargs)
+        future.add_done_callback(print_exception)
+        task = Task(future, on_cancel)
+        self.tasks = [task for task in self.tasks if not task.done()] + [task]
+        return task
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancels all tasks and stops threads"""
+        for task in self.tasks:
+            task.cancel()
+        self.executor.shutdown(wait)
+
+
+def print_exception(future: Future) -> None:
+    """Prints exception of failed task, which would otherwise be kept silently in its future"""
+    if future.cancelled():
+        return
+    exception = future.exception()
+    if exception is not None:
+        traceback.print_exception(type(exception), exception, exception.__traceback__)
+
+
+_worker_pool = None
+
+
+def worker_pool() -> WorkerPool:
+    """Returns pool shared by the whole application"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+    return _worker_pool
+
+
+class UpdateChannel(QObject):
+    """Collects updates published from any thread and delivers them to GUI's thread at most max_rate times per second.
+    With latest_only only the last update since previous delivery is kept"""
+    updates_ready = pyqtSignal(list)
+    delivery_requested = pyqtSignal(int)
+
+    def __init__(self, max_rate: int = 30, latest_only: bool = False):
+        super().__init__()  # created in GUI's thread, so slots run there
+        self.min_interval = 1 / max_rate
+        self.latest_only = latest_only
+        self.lock = threading.Lock()
+        self.pending = []
+        self.delivery_scheduled = False
+        self.last_delivery_time = 0
+        self.delivery_requested.connect(self.schedule_delivery, Qt.QueuedConnection)
+
+    def is_pending(self) -> bool:
+        """Returns True if published updates are waiting for delivery, so a new frame would replace them"""
+        return self.delivery_scheduled
+
+    def publish(self, update) -> None:
+        """Adds update to the next delivery, thread-safe"""
+        with self.lock:
+            if self.latest_only:
+                self.pending = [update]
+            else:
+                self.pending.append(update)
+            if self.delivery_scheduled:
+                return
+            self.delivery_scheduled = True
+        delay = self.last_delivery_time + self.min_interval - time.monotonic()
+        self.delivery_requested.emit(max(0, int(delay * 1000)))
+
+    def schedule_delivery(self, delay: int) -> None:
+        QTimer.singleShot(delay, self.deliver)
+
+    def deliver(self) -> None:
+        with self.lock:
+            updates, self.pending = self.pending, []
+            self.delivery_scheduled = False
+        self.last_delivery_time = time.monotonic()
+        self.updates_ready.emit(updates)
+
+
+class LogView(QPlainTextEdit):
+    """Read-only log keeping only the last max_lines lines"""
+
+    def __init__(self, max_lines: int = MAX_LOG_LINES):
         super().__init__()
-        self.func = func
-        self.func_kwargs = kwargs
-
-    finished = pyqtSignal()
-
-    def run(self):
-        """Long-running task."""
-        self.func(self.func_kwargs)
-        self.finished.emit()
-
-
-class CustomThread:
-    def __init__(self, worker):
-        self.thread = QThread()
-        self.worker = worker
-
-    def run_task(self):
-        """Threading to avoid GUI freezing"""
-        # Move worker to the thread
-        self.worker.moveToThread(self.thread)
-        # Connect signals and slots
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        # Start the thread
-        self.thread.start()
\ No newline at end of file
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+
+    def append_lines(self, lines: list) -> None:
+        self.appendPlainText('\n'.join(lines))
+        self.ensureCursorVisible()